@@ -0,0 +1,49 @@
+import argparse
+import sys
+import time
+from src.agent.registry import AGENTS, get_agent, solution_states, solution_cost
+from src.environment.env import Environment
+from src.environment.track import Track
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Solve a race track with one agent.")
+    parser.add_argument("agent", choices=sorted(AGENTS))
+    parser.add_argument("--length", type=int, default=20, help="track length (default 20)")
+    parser.add_argument("--seed", type=int, help="generate the track from this seed")
+    parser.add_argument("--goal", type=int, help="goal position (default length - 1)")
+    parser.add_argument("--visualize", action="store_true",
+                        help="draw the search graph to graph.png (needs networkx, pydot and IPython)")
+    args = parser.parse_args(argv)
+
+    track = Track.from_seed(args.length, args.seed) if args.seed is not None else Track(args.length)
+    env = Environment(args.length, track=track)
+    goal = args.goal if args.goal is not None else args.length - 1
+
+    visualizer = None
+    if args.visualize:
+        from src.agent.visualize import Visualizer
+        visualizer = Visualizer()
+
+    solve = get_agent(args.agent)
+    start = time.perf_counter()
+    solution = solve(env, goal, visualizer=visualizer)
+    elapsed = time.perf_counter() - start
+
+    if not solution:
+        print("No solution found (%.2f ms)" % (elapsed * 1000))
+        return 1
+
+    states = solution_states(solution)
+    print("Solution path:", states)
+    print("Total steps:", len(states) - 1)
+    cost = solution_cost(solution)
+    if cost is not None:
+        print("Total cost:", round(cost, 2))
+    print("Solved in %.2f ms" % (elapsed * 1000))
+
+    if visualizer:
+        visualizer.show_graph(states)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,62 +11,68 @@ from src.environment.terrain import Terrain
 from src.environment.obs_reward import Obstacles
 from src.environment.car import Car
 from src.agent.visualize import Visualizer
-import tracemalloc
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from src.agent.q_table import ACTIONS, GreedyPolicy, QTable
 
 
-def q_learning(env, episodes, alpha=0.1, gamma=0.9, epsilon=0.1):
-    Q = {}  # Initialize the Q-table as a dictionary
-    actions = ["accelerate", "decelerate", "recharge", "move"]
+def q_learning(env, episodes, alpha=0.1, gamma=0.9, epsilon=0.1, speed_step=0.5, battery_step=5,
+               replay=None, batch_size=32, replay_updates=1, table=None):
+    # Q-table over a (position, speed, battery) grid, see q_table.py; pass table to keep
+    # training an existing one. With a ReplayBuffer every transition is also stored there,
+    # and each step adds replay_updates minibatch updates drawn from it on top of the
+    # update from the transition itself
+    Q = table if table is not None else QTable(env.track.length, speed_step, battery_step)
 
     for episode in range(episodes):
+        env.reset()  # Start every episode from the start line of the same track
         state = env.get_state()  # Get the initial state
+        cell = Q.cell(state)  # and its grid cell
         done = False
 
         while not done:
-            # Ensure state exists in Q-table
-            if state not in Q:
-                Q[state] = {action: 0 for action in actions}
-
             # Epsilon-greedy policy
             if random.uniform(0, 1) < epsilon:
-                action = random.choice(actions)  # Explore: a random action
+                action = random.randrange(len(ACTIONS))  # Explore: a random action
             else:
                 # Exploit: take the action with the highest Q-value
-                action = max(Q[state], key=Q[state].get)
+                action = Q.best_action_index(cell)
 
             # Take the action
-            new_state, reward, done = env.step(action)
-
-            # Ensure the new state exists in the Q-table
-            if new_state not in Q:
-                Q[new_state] = {action: 0 for action in actions}
+            new_state, reward, done = env.step(ACTIONS[action])
+            new_cell = Q.cell(new_state)
 
-            # Get the maximum future Q-value for the new state
-            max_future_q = max(Q[new_state].values())
+            # Move Q(state, action) towards reward + gamma * max Q(new_state, .)
+            Q.update_cell(cell, action, reward, new_cell, done, alpha, gamma)
 
-            # Update the Q-value for the current state-action pair
-            Q[state][action] += alpha * (reward + gamma * max_future_q - Q[state][action])
+            if replay is not None:
+                replay.add(state, action, reward, new_state, done)
+                if len(replay) >= batch_size:
+                    for _ in range(replay_updates):
+                        replay_batch(Q, replay, batch_size, alpha, gamma)
 
             # Move to the next state
-            state = new_state
+            state, cell = new_state, new_cell
 
     return Q
 
+def replay_batch(Q, replay, batch_size, alpha=0.1, gamma=0.9):
+    indices, states, actions, rewards, new_states, dones, weights = replay.sample(batch_size)
+    td_errors = Q.update_batch(Q.cells(states), actions, rewards, Q.cells(new_states), dones, alpha, gamma, weights)
+    if replay.prioritized:
+        replay.update_priorities(indices, td_errors)
+
 def test_q_learning(q_table, env, action_space):
-    env.rebuild()  # Reset the environment
+    env.reset()  # Reset the car on the track it was trained on
     state = env.get_state()  # Get the initial state
     done = False
 
     while not done:
-        # Ensure the state exists in the Q-table
-        if state not in q_table:
+        # Ensure the state was trained on
+        if not q_table.seen(state):
             print("State not found in Q-table, taking random action.")
             action = random.choice(action_space)
         else:
             # Select the best action from Q-table
-            action = max(q_table[state], key=q_table[state].get) 
+            action = q_table.best_action(state)
 
         new_state, reward, done = env.step(action)
         print(f"State: {new_state}, Reward: {reward}, Action: {action}")
@@ -79,7 +85,10 @@ def test_q_learning(q_table, env, action_space):
         print("Failed.")
 
 def visualize_simulation(q_table, env, action_space):
-    env.rebuild() 
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    env.reset() 
     state = env.get_state() 
     done = False
     
@@ -90,10 +99,10 @@ def visualize_simulation(q_table, env, action_space):
     rewards = []
     
     while not done:
-        if state not in q_table:
+        if not q_table.seen(state):
             action = random.choice(action_space)
         else:
-            action = max(q_table[state], key=q_table[state].get)
+            action = q_table.best_action(state)
             
         new_state, reward, done = env.step(action)
         positions.append(state[0])
@@ -137,22 +146,29 @@ def visualize_simulation(q_table, env, action_space):
     
     plt.show()
 
-env = Environment(track_length=10)
-action_space = ["accelerate", "decelerate", "recharge", "move"]
-q_table = q_learning(env, episodes=1000, alpha=0.1, gamma=0.9, epsilon=0.1)
+def main():
+    env = Environment(track_length=10)
+    action_space = ["accelerate", "decelerate", "recharge", "move"]
+    q_table = q_learning(env, episodes=1000, alpha=0.1, gamma=0.9, epsilon=0.1)
+    # the runs below only need the argmax per cell; q_store.save_table/load_policy
+    # would give the same policy from a file
+    policy = GreedyPolicy.from_table(q_table)
+
+    tracemalloc.start()
+    startTime = time.time()
 
-tracemalloc.start()
-startTime = time.time()
+    test_q_learning(policy, env, action_space)
 
-test_q_learning(q_table, env, action_space)
+    endtime = time.time()
+    current,most = tracemalloc.get_traced_memory()
+    totaltime = endtime-startTime
+    visualize_simulation(policy, env, action_space)
 
-endtime = time.time()
-current,most = tracemalloc.get_traced_memory()
-totaltime = endtime-startTime
-visualize_simulation(q_table, env, action_space)
+    print("Current is : " , current)
+    print ("Most is : " , most)
+    print ("Total time is : " , totaltime)
 
-print("Current is : " , current)
-print ("Most is : " , most)
-print ("Total time is : " , totaltime)
+    tracemalloc.stop()
 
-tracemalloc.stop()
+if __name__ == "__main__":
+    main()
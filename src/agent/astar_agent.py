@@ -1,16 +1,15 @@
 import sys
 import os
-import copy
-import time  # for visualization 
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from src.environment.env import Environment
-from src.environment.terrain import Terrain
-from src.environment.obs_reward import Obstacles
+from src.environment.fixed_point import pack_state
+from src.environment.state_graph import step_cost
 from src.environment.car import Car
 from src.agent.visualize import Visualizer
-from src.agent.visualize import Visualizer
+from src.agent import graph_search
+from src.agent.search_tree import SearchTree
 import heapq
-import tracemalloc
 
 def simple_heuristic(car_position, goal):
     return goal - car_position
@@ -33,43 +32,18 @@ def heuristic(car_position, goal_position, speed, battery, track_length):
 
     return distance_to_goal + battery_penalty + speed_penalty
 
-def path_cost(path, goal, length):
-    g_cost = 0
-    for i, cost in path:
-        g_cost += cost
-
-    current = path[-1][0]
-    car_position = current[0]
-    h_cost = heuristic(car_position, goal, current[1], current[2], length)
-    return g_cost + h_cost
-
-def get_successors(environment, path):
+def get_successors(environment, state):
     actions = ["accelerate", "decelerate", "recharge", "move"]
-    state = path[-1][0]
     position = state[0]  
     successors = []
+    start = (position, state[1], state[2], environment.car.coins)
 
     for action in actions:
-        env_copy = copy.deepcopy(environment)
-        env_copy.car.position = position
-        env_copy.car.speed = state[1]
-        env_copy.car.battery = state[2]
-
-        env_copy.step(action)
-        new_state = env_copy.get_state()
+        new_state = environment.peek(start, action)
         new_position = new_state[0]
 
         if new_position > position:
-            segment = env_copy.track.get_segment(new_position)
-            cost = 1
-            new_speed = new_state[1]
-
-            if isinstance(segment, Terrain):
-                cost += max(1, new_speed * segment.get_mult())
-            elif isinstance(segment, Obstacles):
-                cost += max(1, new_speed * 1.5)
-
-            successors.append((new_state, cost))
+            successors.append((new_state, step_cost(environment.track, new_state)))
     return successors
 
 def visualize(solution, track_length):
@@ -88,69 +62,89 @@ def visualize(solution, track_length):
         time.sleep(0.5)
     print("Goal Reached!")
 
-def astar(environment, goal, visualizer=None):
-    initial_state = environment.get_state()
-    frontier = []
-    heapq.heappush(frontier, (0, [(initial_state, 0)]))  
-    visited = {}
+def astar(environment, goal, visualizer=None, graph=None, h=None):
+    # h(state) overrides the default heuristic, e.g. cost_to_go(environment, goal).value
+    length = environment.track.length
+    values_key = ("astar", goal)
+    if h is None:
+        h = lambda state: heuristic(state[0], goal, state[1], state[2], length)
+    else:
+        values_key += (h,)
+
+    if graph is not None:
+        # compiled state graph of this track, see src/environment/state_graph.py
+        return graph_search.astar(graph, goal, graph.node_values(values_key, h))
+
+    return weighted_astar(environment, goal, h, visualizer=visualizer)
+
+def weighted_astar(environment, goal, h, weight=1, bound=float('inf'), stop=None, visualizer=None):
+    # best-first search on g + weight * h(state). States whose g reaches `bound` (the cost of
+    # a solution already in hand) are dropped; stop() is polled once per expansion and ends
+    # the search early with None
+    tree = SearchTree(environment.get_state())
+    best_g = {pack_state(tree.states[0]): 0}
+    closed = set()
+    frontier = [(h(tree.states[0]), 0)]
 
     while frontier:
-        f_cost, path = heapq.heappop(frontier)
-        state = path[-1][0]
-        
+        _, node = heapq.heappop(frontier)
+        state = tree.states[node]
+        key = pack_state(state)
+        if key in closed:
+            # stale entry, the state was already expanded through a cheaper path
+            continue
+        closed.add(key)
+
         if state[0] >= goal:
-            return path
+            return tree.path(node)
 
-        if environment.game_over():
-            continue
+        if stop is not None and stop():
+            return None
 
-        if state in visited and visited[state] <= f_cost:
+        if environment.game_over():
             continue
 
-        visited[state] = f_cost
-
-        successors = get_successors(environment, path)
-        for new_state, cost in successors:
+        g = tree.g[node]
+        for new_state, cost in get_successors(environment, state):
             if visualizer:
                 visualizer.add_state(state, new_state, action="move")
 
-            if new_state not in visited or visited[new_state] > f_cost + cost:
-                new_path = path + [(new_state, cost)]
-                heapq.heappush(frontier, (path_cost(new_path, goal, environment.track.length), new_path))
+            new_key = pack_state(new_state)
+            new_g = g + cost
+            if new_key in closed or new_g >= best_g.get(new_key, float('inf')) or new_g >= bound:
+                continue
+            best_g[new_key] = new_g
+            child = tree.add(new_state, node, cost)
+            heapq.heappush(frontier, (new_g + weight * h(new_state), child))
 
     return None 
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        solution = astar(env, env.track.length -1)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time 
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        sol = astar(env, env.track.length - 1)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory
+def anytime_astar(environment, goal, visualizer=None, time_limit=None, on_solution=None,
+                  cancel=None, weight=5.0, decay=0.6, h=None):
+    # weighted A* restarted with a smaller weight each round, down to plain A*. Every round
+    # only looks for paths cheaper than the best one so far; each improvement is passed to
+    # on_solution(solution, cost, weight). Stops after `time_limit` seconds or once
+    # cancel() is true (e.g. a threading.Event's is_set) and returns the best path found.
+    length = environment.track.length
+    if h is None:
+        h = lambda state: heuristic(state[0], goal, state[1], state[2], length)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    def stop():
+        return (deadline is not None and time.perf_counter() >= deadline) or (cancel is not None and cancel())
+
+    best, best_cost = None, float('inf')
+    while True:
+        solution = weighted_astar(environment, goal, h, weight, best_cost, stop, visualizer)
+        if solution is not None:
+            cost = sum(cost for _, cost in solution)
+            if cost < best_cost:
+                best, best_cost = solution, cost
+                if on_solution:
+                    on_solution(solution, cost, weight)
+        if weight <= 1 or stop():
+            return best
+        weight = max(1.0, weight * decay)
 
 def main():
     env = Environment(track_length=100)  
@@ -170,7 +164,5 @@ def main():
         print("No solution found")
         visualizer.show_graph()
 
-main()
-#calc_avg_runtime()
-
-#calc_avg_memory()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
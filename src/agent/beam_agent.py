@@ -0,0 +1,76 @@
+from src.environment.env import Environment
+from src.environment.fixed_point import pack_state
+from src.agent.astar_agent import get_successors, heuristic, visualize
+from src.agent.search_tree import SearchTree
+from src.agent.visualize import Visualizer
+import heapq
+
+# beam search: expand the search one move at a time and keep only the `width` most
+# promising states of each layer, ranked by g + h as in A*. Work per layer is bounded by
+# 4 * width successors and the tree grows by at most that much, whatever the track length.
+# Reaching the goal doesn't stop it: later layers go on while they hold states cheaper
+# than the best goal so far.
+
+def beam_search(environment, goal, visualizer=None, width=16, h=None):
+    length = environment.track.length
+    if h is None:
+        h = lambda state: heuristic(state[0], goal, state[1], state[2], length)
+
+    tree = SearchTree(environment.get_state())
+    if tree.states[0][0] >= goal:
+        return tree.path(0)
+    if environment.game_over():
+        return None
+
+    beam = [0]
+    best = None
+    while beam:
+        # cheapest way into each state of the next layer; a state reached twice keeps the lower g
+        layer = {}
+        for node in beam:
+            state = tree.states[node]
+            g = tree.g[node]
+            for new_state, cost in get_successors(environment, state):
+                if visualizer:
+                    visualizer.add_state(state, new_state, action="move")
+
+                key = pack_state(new_state)
+                best_entry = layer.get(key)
+                if best_entry is None or g + cost < best_entry[0]:
+                    layer[key] = (g + cost, node, new_state, cost)
+
+        candidates = []
+        for entry in layer.values():
+            new_g, node, new_state, cost = entry
+            if best is not None and new_g >= best[0]:
+                # step costs are positive, this can't beat the goal we already have
+                continue
+            if new_state[0] >= goal:
+                best = (new_g, tree.add(new_state, node, cost))
+            else:
+                candidates.append(entry)
+        if best is not None:
+            candidates = [entry for entry in candidates if entry[0] < best[0]]
+
+        ranked = heapq.nsmallest(width, candidates, key=lambda entry: entry[0] + h(entry[2]))
+        beam = [tree.add(new_state, node, cost) for new_g, node, new_state, cost in ranked]
+
+    return tree.path(best[1]) if best is not None else None
+
+def main():
+    env = Environment(track_length=100)
+    visualizer = Visualizer()
+    solution = beam_search(env, env.track.length - 1, visualizer)
+
+    if solution:
+        print("Solution path:", solution)
+        print("Total cost:", sum(cost for _, cost in solution))
+
+        visualize(solution, env.track.length)
+        visualizer.show_graph(solution)
+    else:
+        print("No solution found")
+        visualizer.show_graph()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from array import array
+from collections import OrderedDict
+from src.environment.state_graph import ACTIONS, compile_graph
+
+# exact cost-to-go of every reachable state of a track, under the edge costs A*, UCS and
+# greedy use (state_graph.step_cost). Every edge moves the car forward, so the compiled
+# graph is a DAG and one backward pass over the nodes in decreasing position order
+# settles each node from its already final successors.
+
+class CostToGo:
+    def __init__(self, graph, goal):
+        self.graph = graph
+        self.goal = goal
+        n = len(graph)
+        self.values = array('d', [float('inf')]) * n
+        # edge index of the cheapest way on from each node, -1 at goal and dead-end nodes
+        self.best_edges = array('l', [-1]) * n
+
+        positions, offsets, targets, costs = graph.positions, graph.offsets, graph.targets, graph.costs
+        values, best_edges = self.values, self.best_edges
+        for node in sorted(range(n), key=positions.__getitem__, reverse=True):
+            if positions[node] >= goal:
+                values[node] = 0
+                continue
+            for edge in range(offsets[node], offsets[node + 1]):
+                value = costs[edge] + values[targets[edge]]
+                if value < values[node]:
+                    values[node] = value
+                    best_edges[node] = edge
+
+    def value(self, state):
+        # cost of the cheapest way from state to the goal, inf if the goal can't be reached.
+        # States outside the graph (another start) get 0, which keeps it admissible
+        node = self.graph.node(state)
+        return self.values[node] if node is not None else 0
+
+    def action(self, state):
+        # optimal action in state, None at the goal or when no action reaches it
+        node = self.graph.node(state)
+        if node is None or self.best_edges[node] < 0:
+            return None
+        return ACTIONS[self.graph.actions[self.best_edges[node]]]
+
+    def path(self):
+        # optimal [(state, step cost), ...] from the start, in the format of the A* agent
+        graph = self.graph
+        if self.values[0] == float('inf'):
+            return None
+        path = [(graph.start, 0)]
+        node = 0
+        while self.best_edges[node] >= 0:
+            edge = self.best_edges[node]
+            node = graph.targets[edge]
+            path.append((graph.state(node, graph.coins[edge]), graph.costs[edge]))
+        return path
+
+# a few tables at a time, keyed by what they depend on: the track layout (content hash),
+# the goal and the start state
+_tables = OrderedDict()
+MAX_TABLES = 8
+
+def cost_to_go(environment, goal, start=None):
+    start = tuple(start if start is not None else environment.get_state())
+    key = (environment.track.content_hash(), goal, start[:3])
+    table = _tables.get(key)
+    if table is None:
+        table = CostToGo(compile_graph(environment, start), goal)
+        _tables[key] = table
+        if len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    else:
+        _tables.move_to_end(key)
+    return table
+
+def clear():
+    _tables.clear()
+
+def dp_policy(environment, goal, visualizer=None):
+    # follow the optimal actions of the cost-to-go table from the current state
+    table = cost_to_go(environment, goal)
+    solution = table.path()
+    if visualizer and solution:
+        for (state, _), (new_state, _) in zip(solution, solution[1:]):
+            visualizer.add_state(state, new_state, action="move")
+    return solution
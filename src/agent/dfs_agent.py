@@ -3,13 +3,14 @@ import os
 import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from src.environment.env import Environment
+from src.environment.fixed_point import pack_state
 from src.environment.terrain import Terrain
 from src.environment.obs_reward import Obstacles
 from src.environment.car import Car
 from src.agent.visualize import Visualizer
+from src.agent import graph_search
+from src.agent.search_tree import SearchLimitReached, SearchTree
 from collections import deque
-import copy
-import tracemalloc
 
 def visualize_sol(solution, track_length):
     for position in solution:  
@@ -29,93 +30,66 @@ def get_successors(environment, path):
     state = path[-1][0]
     position = state[0]
     successors = []
+    start = (position, state[1], state[2], environment.car.coins)
 
     for action in actions:
-        env_copy = copy.deepcopy(environment)
-        env_copy.car.position = position
-        env_copy.car.speed = state[1]
-        env_copy.car.battery = state[2]
-
-        env_copy.step(action)
-        new_state = env_copy.get_state()
+        new_state = environment.peek(start, action)
         new_position = new_state[0]
 
         if new_position > position:
             successors.append((new_state, 1))
     return successors
 
-def dfs(environment, goal, visualizer=None):
-    initial_state = environment.get_state()
-    frontier = deque([(initial_state, None, None)])  
-    visited = set()
-    explored = []
+def dfs(environment, goal, visualizer=None, graph=None, max_nodes=None):
+    if graph is not None:
+        # compiled state graph of this track, see src/environment/state_graph.py
+        return graph_search.dfs(graph, goal)
+
+    tree = SearchTree(environment.get_state())
+    frontier = deque([0])
+    # packed states generated so far, by position; each enters the frontier once, from
+    # the first state that generates it. Moves only go forward, so once every frontier
+    # state is past a position nothing can reach it again, and its entries are dropped
+    root = tree.states[0]
+    seen = {root[0]: {pack_state(root)}}
+    waiting = {root[0]: 1}
+    rear = root[0]
 
     while frontier:
-        state, parent, action = frontier.pop()
+        node = frontier.pop()
+        state = tree.states[node]
+        parent = tree.states[tree.parents[node]] if node else None
+        waiting[state[0]] -= 1
 
         if visualizer and parent is not None:
-            visualizer.add_state(parent, state, action)
+            visualizer.add_state(parent, state, None)
 
         if state[0] >= goal:
             if visualizer:
                 visualizer.add_state(parent, state, "goal")
-            
-            solution_path = [state]
-            while parent:
-                solution_path.append(parent)
-                parent = next((p for s, p, _ in explored if s == parent), None)
-            solution_path.reverse()
-            return solution_path
-
-        if environment.game_over():
-            continue
-
-        if state in visited:
-            continue
-
-        visited.add(state)
-        path = [(state, 0)]
-        successors = get_successors(environment, path)
-
-        for new_state, i in successors:
-            if new_state not in visited:
-                frontier.append((new_state, state, action))
-                explored.append((new_state, state, action))
+            return tree.state_path(node)
+
+        if not environment.game_over():
+            path = [(state, 0)]
+            for new_state, i in get_successors(environment, path):
+                key = pack_state(new_state)
+                keys = seen.setdefault(new_state[0], set())
+                if key not in keys:
+                    keys.add(key)
+                    frontier.append(tree.add(new_state, node, 1))
+                    waiting[new_state[0]] = waiting.get(new_state[0], 0) + 1
+
+        while frontier and not waiting.get(rear):
+            waiting.pop(rear, None)
+            seen.pop(rear, None)
+            rear += 1
+
+        if max_nodes is not None and len(tree) > max_nodes:
+            # every generated state stays in the tree, so this bounds memory as a whole
+            raise SearchLimitReached("dfs stored more than %d states" % max_nodes)
 
     return None
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        solution = dfs(env, env.track.length -1)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        sol = dfs(env, env.track.length - 1)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory
-
 def main():
     env = Environment(track_length=15)
     visualizer = Visualizer()
@@ -136,7 +110,5 @@ def main():
     else:
         print("No solution")
 
-main()
-
-#calc_avg_runtime()
-# calc_avg_memory()
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,12 @@
 from src.environment.env import Environment
-from src.environment.terrain import Terrain
-from src.environment.obs_reward import Obstacles
+from src.environment.fixed_point import pack_state
+from src.environment.state_graph import step_cost
 from src.environment.car import Car
 from src.agent.visualize import Visualizer
+from src.agent import graph_search
+from src.agent.search_tree import SearchTree
 import heapq
-import copy
 import time
-import tracemalloc
 
 def visualize(solution, track_length):
     for step in solution:
@@ -42,105 +42,65 @@ def heuristic(car_position, goal_position, speed, battery, track_length):
 
     return distance_to_goal + battery_penalty + speed_penalty
 
-def path_cost(path, goal, length):
-    current = path[-1][0]
-    car_position = current[0]
-    h_cost = heuristic(car_position, goal, current[1], current[2], length)
-    return h_cost
-
-def get_successors(environment, path):
+def get_successors(environment, state):
     actions = ["accelerate", "decelerate", "recharge", "move"]
-    state = path[-1][0]
     position = state[0]  
     successors = []
+    start = (position, state[1], state[2], environment.car.coins)
 
     for action in actions:
-        env_copy = copy.deepcopy(environment)
-        env_copy.car.position = position
-        env_copy.car.speed = state[1]
-        env_copy.car.battery = state[2]
-
-        env_copy.step(action)
-        new_state = env_copy.get_state()
+        new_state = environment.peek(start, action)
         new_position = new_state[0]
 
         if new_position > position:
-            segment = env_copy.track.get_segment(new_position)
-            cost = 1
-            new_speed = new_state[1]
-
-            if isinstance(segment, Terrain):
-                cost += max(1, new_speed * segment.get_mult())
-            elif isinstance(segment, Obstacles):
-                cost += max(1, new_speed * 1.5)
-
-            successors.append((new_state, cost))
+            successors.append((new_state, step_cost(environment.track, new_state)))
     return successors
 
-def greedy(environment, goal, visualizer=None):
-    initial_state = environment.get_state()
-    frontier = []
-    heapq.heappush(frontier, (0, [(initial_state, 0)]))  
-    visited = {}
+def greedy(environment, goal, visualizer=None, graph=None):
+    if graph is not None:
+        # compiled state graph of this track, see src/environment/state_graph.py
+        length = environment.track.length
+        h = graph.node_values(("greedy", goal), lambda state: heuristic(state[0], goal, state[1], state[2], length))
+        return graph_search.greedy(graph, goal, h)
+
+    length = environment.track.length
+    tree = SearchTree(environment.get_state())
+    root = tree.states[0]
+    best_g = {pack_state(root): 0}
+    closed = set()
+    frontier = [(heuristic(root[0], goal, root[1], root[2], length), 0)]
 
     while frontier:
-        f_cost, path = heapq.heappop(frontier)
-        state = path[-1][0]
-        
+        _, node = heapq.heappop(frontier)
+        state = tree.states[node]
+        key = pack_state(state)
+        if key in closed:
+            # stale entry, the state was already expanded
+            continue
+        closed.add(key)
+
         if state[0] >= goal:
-            return path
+            return tree.path(node)
 
         if environment.game_over():
             continue
 
-        if state in visited and visited[state] <= f_cost:
-            continue
-
-        visited[state] = f_cost
-
-        successors = get_successors(environment, path)
-        for new_state, cost in successors:
+        g = tree.g[node]
+        for new_state, cost in get_successors(environment, state):
             if visualizer:
                 visualizer.add_state(state, new_state, action="move")
 
-            if new_state not in visited or visited[new_state] > f_cost + cost:
-                new_path = path + [(new_state, cost)]
-                heapq.heappush(frontier, (path_cost(new_path, goal, environment.track.length), new_path))
+            # the order ignores g, but it still decides which parent a state keeps
+            new_key = pack_state(new_state)
+            new_g = g + cost
+            if new_key in closed or new_g >= best_g.get(new_key, float('inf')):
+                continue
+            best_g[new_key] = new_g
+            child = tree.add(new_state, node, cost)
+            heapq.heappush(frontier, (heuristic(new_state[0], goal, new_state[1], new_state[2], length), child))
 
     return None  
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        solution = greedy(env, env.track.length -1)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        sol = greedy(env, env.track.length - 1)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory
-
 def main():
     env = Environment(track_length=20)  
     visualizer = Visualizer()
@@ -160,6 +120,5 @@ def main():
         print("no solution")
         visualizer.show_graph()
 
-main()
-#calc_avg_runtime()
-#calc_avg_memory()
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 import sys
 import os
 import random
-import copy
 import time
-import tracemalloc
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from src.environment.env import Environment
 from src.agent.astar_agent import astar
@@ -28,15 +26,10 @@ def mutate(path, environment):
     index = random.randint(0, len(path) - 2)
     state = path[index][0]
     actions = ["accelerate", "decelerate", "recharge", "move"]
-    mutated_path = copy.deepcopy(path[:index+1])
-    
-    env_copy = copy.deepcopy(environment)
-    env_copy.car.position = state[0]
-    env_copy.car.speed = state[1]
-    env_copy.car.battery = state[2]
-    
-    env_copy.step(random.choice(actions))
-    mutated_path.append((env_copy.get_state(), 1))
+    mutated_path = path[:index+1]
+
+    start = (state[0], state[1], state[2], environment.car.coins)
+    mutated_path.append((environment.peek(start, random.choice(actions)), 1))
 
     return mutated_path
 
@@ -58,39 +51,6 @@ def visualize_genetic_algorithm(environment, path, visualizer):
     print("Goal Reached!")
     visualizer.show_graph()
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        visualizer = Visualizer()
-        solution = genetic_algorithm(env, i - 1, visualizer=visualizer)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        visualizer = Visualizer()
-        sol = genetic_algorithm(env, i - 1, visualizer=visualizer)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory 
 def genetic_algorithm(environment, goal, generations=100, visualizer=None):
     population = [
         astar(environment, goal),
@@ -141,12 +101,16 @@ def genetic_algorithm(environment, goal, generations=100, visualizer=None):
     return best_solution
 
 
-env = Environment(track_length=10)  
-visualizer = Visualizer()  
-solution = genetic_algorithm(env, env.track.length - 1, generations=100, visualizer=visualizer)  # Pass visualizer here
+def main():
+    env = Environment(track_length=10)  
+    visualizer = Visualizer()  
+    solution = genetic_algorithm(env, env.track.length - 1, generations=100, visualizer=visualizer)  # Pass visualizer here
 
-print("Solution path:", solution)
-print("Total steps:", len(solution) - 1)
+    print("Solution path:", solution)
+    print("Total steps:", len(solution) - 1)
     
-# Optionally visualize the final solution path
-visualize_genetic_algorithm(env, solution, visualizer)
\ No newline at end of file
+    # Optionally visualize the final solution path
+    visualize_genetic_algorithm(env, solution, visualizer)
+
+if __name__ == "__main__":
+    main()
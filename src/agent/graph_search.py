@@ -0,0 +1,110 @@
+from collections import deque
+from array import array
+import heapq
+
+# searches over a StateGraph from src.environment.state_graph; node 0 is the start state.
+# Heaps hold (priority, node id), visited sets are bytearrays indexed by node id and the
+# solution is rebuilt from parent arrays once a goal is popped.
+
+def weighted_path(graph, parents, parent_edges, node):
+    path = []
+    while node != 0:
+        edge = parent_edges[node]
+        path.append((graph.state(node, graph.coins[edge]), graph.costs[edge]))
+        node = parents[node]
+    path.append((graph.start, 0))
+    path.reverse()
+    return path
+
+def state_path(graph, parents, parent_edges, node):
+    return [state for state, cost in weighted_path(graph, parents, parent_edges, node)]
+
+def best_first(graph, goal, g_weight, h=None):
+    # priority g_weight * g + h; A* is (1, h), UCS is (1, None), greedy is (0, h)
+    n = len(graph)
+    g_costs = array('d', [float('inf')]) * n
+    parents = array('l', [-1]) * n
+    parent_edges = array('l', [-1]) * n
+    closed = bytearray(n)
+    positions, offsets, targets, costs = graph.positions, graph.offsets, graph.targets, graph.costs
+
+    g_costs[0] = 0
+    frontier = [(h[0] if h is not None else 0, 0)]
+    while frontier:
+        _, node = heapq.heappop(frontier)
+        if closed[node]:
+            continue
+        closed[node] = 1
+
+        if positions[node] >= goal:
+            return weighted_path(graph, parents, parent_edges, node)
+
+        g = g_costs[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            new_g = g + costs[edge]
+            if closed[target] or new_g >= g_costs[target]:
+                continue
+            g_costs[target] = new_g
+            parents[target] = node
+            parent_edges[target] = edge
+            priority = g_weight * new_g + (h[target] if h is not None else 0)
+            heapq.heappush(frontier, (priority, target))
+    return None
+
+def astar(graph, goal, h):
+    return best_first(graph, goal, 1, h)
+
+def ucs(graph, goal):
+    return best_first(graph, goal, 1)
+
+def greedy(graph, goal, h):
+    return best_first(graph, goal, 0, h)
+
+def bfs(graph, goal):
+    n = len(graph)
+    parents = array('l', [-1]) * n
+    parent_edges = array('l', [-1]) * n
+    seen = bytearray(n)
+    positions, offsets, targets = graph.positions, graph.offsets, graph.targets
+
+    seen[0] = 1
+    frontier = deque([0])
+    while frontier:
+        node = frontier.popleft()
+        if positions[node] >= goal:
+            return state_path(graph, parents, parent_edges, node)
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            if not seen[target]:
+                seen[target] = 1
+                parents[target] = node
+                parent_edges[target] = edge
+                frontier.append(target)
+    return None
+
+def dfs(graph, goal):
+    n = len(graph)
+    parents = array('l', [-1]) * n
+    parent_edges = array('l', [-1]) * n
+    visited = bytearray(n)
+    positions, offsets, targets = graph.positions, graph.offsets, graph.targets
+
+    frontier = [0]
+    while frontier:
+        node = frontier.pop()
+        if visited[node]:
+            continue
+        visited[node] = 1
+
+        if positions[node] >= goal:
+            return state_path(graph, parents, parent_edges, node)
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            if not visited[target]:
+                parents[target] = node
+                parent_edges[target] = edge
+                frontier.append(target)
+    return None
@@ -6,9 +6,7 @@ from src.environment.terrain import Terrain
 from src.environment.obs_reward import Obstacles
 from src.environment.car import Car
 from src.agent.visualize import Visualizer
-import copy
 import time
-import tracemalloc
 
 def visualize(environment, path):
     track_length = environment.track.length  
@@ -37,15 +35,10 @@ def get_best_neighbor(environment, current_state, goal, visualizer=None):
     actions = ["accelerate", "decelerate", "recharge"]
     best_state = None
     best_heuristic = float('-inf')
+    start = (current_state[0], current_state[1], current_state[2], environment.car.coins)
     
     for action in actions:
-        env_copy = copy.deepcopy(environment)
-        env_copy.car.position = current_state[0]
-        env_copy.car.speed = current_state[1]
-        env_copy.car.battery = current_state[2]
-        
-        env_copy.step(action)
-        new_state = env_copy.get_state()
+        new_state = environment.peek(start, action)
         new_position = new_state[0]
 
         if new_position > current_state[0]: 
@@ -59,38 +52,6 @@ def get_best_neighbor(environment, current_state, goal, visualizer=None):
 
     return best_state
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        solution = hill_climb(env, env.track.length -1)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        sol = hill_climb(env, env.track.length - 1)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory
-
 def hill_climb(environment, goal, visualizer=None):
     current_state = environment.get_state()
     path = [(current_state, 0)]
@@ -121,6 +82,5 @@ def main():
         print("No solution found")
         visualizer.show_graph()
 
-main()
-#calc_avg_runtime()
-# calc_avg_memory()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from src.environment.env import Environment
+from src.environment.fixed_point import pack_state
+from src.agent.astar_agent import get_successors, heuristic, visualize
+from src.agent.visualize import Visualizer
+
+# IDA*: repeated depth-first searches over the states with g + h <= bound, raising the
+# bound each time to the smallest f that went over it. Same step costs and heuristic as
+# the A* agent, but only the current path lives on a stack instead of a whole frontier.
+# Every move goes forward, so a path can't run into a cycle and needs no visited set;
+# states are simulated again whenever they come up, through the bounded transition
+# cache of Environment.peek.
+#
+# The one other structure is a transposition table of at most table_size states per
+# iteration, with the cheapest g each was entered with: entering one again no cheaper can
+# only repeat the same search. Many paths lead to the same state here, and without it the
+# search redoes them all. Memory is the path plus table_size entries, whatever the track;
+# table_size=0 gives plain IDA*.
+
+TABLE_SIZE = 2 ** 14
+
+def expand(environment, state, h):
+    # successors as (state, step cost, h) tuples
+    return [(new_state, cost, h(new_state)) for new_state, cost in get_successors(environment, state)]
+
+def bounded_search(environment, goal, root, bound, h, visualizer=None, table_size=TABLE_SIZE):
+    # one iteration; returns (solution or None, smallest f above bound)
+    next_bound = float('inf')
+    best_g = {}
+    path = [(root, 0)]
+    g_costs = [0]
+    children = [iter(expand(environment, root, h))]
+
+    while children:
+        child = next(children[-1], None)
+        if child is None:
+            path.pop()
+            g_costs.pop()
+            children.pop()
+            continue
+
+        new_state, cost, new_h = child
+        if visualizer:
+            visualizer.add_state(path[-1][0], new_state, action="move")
+
+        g = g_costs[-1] + cost
+        f = g + new_h
+        if f > bound:
+            next_bound = min(next_bound, f)
+            continue
+
+        if new_state[0] >= goal:
+            return path + [(new_state, cost)], next_bound
+
+        if table_size:
+            key = pack_state(new_state)
+            best = best_g.get(key)
+            if best is not None and best <= g:
+                continue
+            if best is not None or len(best_g) < table_size:
+                best_g[key] = g
+
+        path.append((new_state, cost))
+        g_costs.append(g)
+        children.append(iter(expand(environment, new_state, h)))
+
+    return None, next_bound
+
+def ida_star(environment, goal, visualizer=None, h=None, table_size=TABLE_SIZE):
+    # h(state) overrides the A* heuristic, e.g. cost_to_go(environment, goal).value
+    length = environment.track.length
+    if h is None:
+        h = lambda state: heuristic(state[0], goal, state[1], state[2], length)
+
+    root = environment.get_state()
+    if root[0] >= goal:
+        return [(root, 0)]
+    if environment.game_over():
+        return None
+
+    bound = h(root)
+    while bound != float('inf'):
+        solution, bound = bounded_search(environment, goal, root, bound, h, visualizer, table_size)
+        if solution:
+            return solution
+    return None
+
+def main():
+    env = Environment(track_length=100)
+    visualizer = Visualizer()
+    solution = ida_star(env, env.track.length - 1, visualizer)
+
+    if solution:
+        print("Solution path:", solution)
+        print("Total cost:", sum(cost for _, cost in solution))
+
+        visualize(solution, env.track.length)
+        visualizer.show_graph(solution)
+    else:
+        print("No solution found")
+        visualizer.show_graph()
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,12 @@ import os
 import time  
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from src.environment.env import Environment
+from src.environment.fixed_point import pack_state
 from src.environment.terrain import Terrain
 from src.environment.obs_reward import Obstacles
 from src.environment.car import Car
 from collections import deque
 from src.agent.visualize import Visualizer
-import tracemalloc
 
 def visualize(environment, path):
     track_length = environment.track.length 
@@ -25,101 +25,111 @@ def visualize(environment, path):
         time.sleep(0.5) 
     print("Goal Reached!")
 
-def get_successors(environment, path):
+def get_successors(environment, state):
     actions = ["accelerate", "decelerate", "recharge", "move"]
-    state = path[-1][0]
     position = state[0]
     successors = []
     seen_states = set()
+    start = (position, state[1], state[2], environment.car.coins)
 
     for action in actions:
-        environment.car.position = position
-        environment.car.speed = state[1]
-        environment.car.battery = state[2]
-
-        environment.step(action)
-        new_state = environment.get_state()
+        new_state = environment.peek(start, action)
         new_position = new_state[0]
 
-        if new_position > position and new_state not in seen_states:
+        new_key = pack_state(new_state)
+        if new_position > position and new_key not in seen_states:
             successors.append((new_state, 1))
-            seen_states.add(new_state)
+            seen_states.add(new_key)
     return successors
 
-def dfs_limited(environment, goal, limit, visualizer=None):
+# states whose searched depth budget the transposition table keeps, besides the root;
+# see dfs_limited
+TABLE_SIZE = 2 ** 14
+
+def dfs_limited(environment, goal, limit, visualizer=None, table=None, table_size=TABLE_SIZE):
+    # depth-first search for a goal at most `limit` moves away, holding only the current
+    # path; successors are generated again whenever a state comes up, through the bounded
+    # transition cache of Environment.peek. `table` is the transposition table ids()
+    # shares between iterations: packed state -> depth budget already searched from it
+    # without reaching the goal, inf when the subtree was exhausted without running into
+    # the limit. It takes at most table_size states besides the root, whose entry ids()
+    # needs to know when to stop; table_size=0 gives plain iterative deepening.
+    table = table if table is not None else {}
     initial_state = environment.get_state()
-    frontier = deque([[(initial_state, 0)]]) 
-    visited = set()  
+    if initial_state[0] >= goal:
+        return [(initial_state, 0)]
+
+    if limit <= 0 or environment.game_over():
+        return None
+
+    root = pack_state(initial_state)
+    table.setdefault(root, -1)
+    path = [(initial_state, 0)]
+    keys = [root]
+    children = [iter(get_successors(environment, initial_state))]
+    # whether the depth limit cut anything off below each node of the path
+    cut = [False]
+
+    while children:
+        child = next(children[-1], None)
+        if child is None:
+            # every successor searched: no goal within the remaining depth from here
+            path.pop()
+            children.pop()
+            key = keys.pop()
+            if cut.pop():
+                budget = limit - len(path)
+                if cut:
+                    cut[-1] = True
+            else:
+                budget = float('inf')
+            if key in table:
+                table[key] = max(table[key], budget)
+            elif key is not None and len(table) <= table_size:
+                table[key] = budget
+            continue
 
-    while frontier:
-        path = frontier.pop()
-        state = path[-1][0]
+        new_state, _ = child
+        if visualizer:
+            visualizer.add_state(path[-1][0], new_state, action="move")
 
-        if state[0] >= goal:
-            return path
+        if new_state[0] >= goal:
+            return path + [(new_state, 1)]
 
-        if len(path) - 1 >= limit:
+        remaining = limit - len(path)
+        if remaining <= 0:
+            # out of depth; a dead end is not a cut-off, anything else is
+            if get_successors(environment, new_state):
+                cut[-1] = True
             continue
 
-        if environment.game_over():
+        new_key = pack_state(new_state) if table_size else None
+        budget = table.get(new_key, -1)
+        if budget >= remaining:
+            if budget != float('inf'):
+                cut[-1] = True
             continue
 
-        if state in visited:
-            continue
-
-        visited.add(state)
-        successors = get_successors(environment, path)
-
-        for new_state, _ in successors:
-            if visualizer:
-                visualizer.add_state(state, new_state, action="move")
-
-            if new_state not in visited:
-                new_path = path + [(new_state, 1)]
-                frontier.append(new_path)
+        path.append((new_state, 1))
+        keys.append(new_key)
+        children.append(iter(get_successors(environment, new_state)))
+        cut.append(False)
 
     return None
 
-def ids(environment, goal, visualizer=None):
+def ids(environment, goal, visualizer=None, table_size=TABLE_SIZE):
+    table = {}
+    root = pack_state(environment.get_state())
     depth = 0
     while True:
-        result = dfs_limited(environment, goal, depth, visualizer)
+        result = dfs_limited(environment, goal, depth, visualizer, table, table_size)
         if result:
             return result
+        if table.get(root) == float('inf'):
+            # the whole reachable space was searched, deeper limits can't help
+            return None
         depth += 1
 
-def calc_avg_runtime():
-    times = []
-    for i in [5, 10, 15, 20, 25, 30, 35, 40]:
-        env = Environment(track_length=i)
-        start = time.time()
-        solution = ids(env, i -1)
-        end = time.time()
-
-        total = end - start
-        times.append(total)
-    
-    avg_time = sum(times) / len(times)
-    print("\nAverage time= ", avg_time)
-    return avg_time
-
-def calc_avg_memory():
-    memory_usages = []
-
-    for i in [5, 10, 15, 20, 25, 30]:
-        env = Environment(track_length=i)
-        
-        tracemalloc.start()  
-        sol = ids(env, i - 1)
-        current, peak = tracemalloc.get_traced_memory()  
-        tracemalloc.stop()
-
-        memory_usages.append(peak)  
-
-    avg_memory = sum(memory_usages) / len(memory_usages)
-    print("\nAverage memory usage (bytes):", avg_memory)
-    return avg_memory
-
 def main():
     env = Environment(track_length=10)
     visualizer = Visualizer()
@@ -136,6 +146,5 @@ def main():
         print("No solution")
         visualizer.show_graph()
 
-main()
-#calc_avg_runtime()
-# calc_avg_memory()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+from src.environment.env import Environment
+from src.environment.fixed_point import pack_state
+from src.environment.state_graph import step_cost
+from src.environment.track import OBSTACLE_CODES
+from src.environment.car import Car
+from src.agent.astar_agent import get_successors, visualize
+from src.agent.visualize import Visualizer
+import heapq
+import math
+
+# Lifelong Planning A* over the A* agent's state space and step costs. The planner
+# listens to Track.set_segment: a change at position p only touches the edges out of the
+# states at p (the car reads the segment it leaves) and the edges into them (the step
+# cost charges the segment it arrives on), and replan() repairs the search from there
+# instead of starting over.
+
+INF = float('inf')
+
+def moves_heuristic(position, goal):
+    # every move costs at least 1 and covers at most MAX_SPEED segments. Unlike the A*
+    # agent's heuristic this is consistent, which LPA* needs: with an inconsistent h a
+    # repair can stop while states ahead of the goal key still hold stale g values
+    return math.ceil(max(0, goal - position) / Car.MAX_SPEED)
+# virtual node every goal state leads to; packed states are never negative. The edge
+# into it has the same cost from every goal state, so it doesn't change which path
+# wins, but it has to be positive: LPA* relies on positive costs to order its repairs
+GOAL = -1
+GOAL_COST = 1
+
+class LPAStar:
+    def __init__(self, environment, goal, h=None, start=None, visualizer=None):
+        self.environment = environment
+        self.track = environment.track
+        self.goal = goal
+        self.visualizer = visualizer
+        # h(state) must be consistent with the step costs, e.g. cost_to_go(...).value
+        self.h = h if h is not None else lambda state: moves_heuristic(state[0], goal)
+        self.expansions = 0
+
+        self.clear_graph()
+        self.token = self.track.token
+        self.track.add_listener(self.segment_changed)
+        self.reset(start if start is not None else environment.get_state())
+
+    def close(self):
+        self.track.remove_listener(self.segment_changed)
+
+    def clear_graph(self):
+        # generated part of the state space: packed state -> state, successor edges of the
+        # expanded states, predecessor edges of every state, and the states per position
+        self.states = {GOAL: None}
+        self.succ = {GOAL: {}}
+        self.pred = {GOAL: {}}
+        self.at_position = {}
+        self.h_values = {GOAL: 0}
+
+    def reset(self, start):
+        # search from a new start; the generated graph stays valid and is reused
+        self.g = {}
+        self.rhs = {}
+        self.queue = []
+        self.queued = {}
+        self.start = self.add_node(tuple(start))
+        self.rhs[self.start] = 0
+        self.update_vertex(self.start)
+
+    def add_node(self, state):
+        key = pack_state(state)
+        if key not in self.states:
+            self.states[key] = state
+            self.pred[key] = {}
+            self.at_position.setdefault(state[0], set()).add(key)
+            self.h_values[key] = self.h(state)
+        return key
+
+    def expand(self, key):
+        state = self.states[key]
+        edges = {}
+        if state[0] >= self.goal:
+            edges[GOAL] = GOAL_COST
+        else:
+            for new_state, cost in get_successors(self.environment, state):
+                if self.visualizer:
+                    self.visualizer.add_state(state, new_state, action="move")
+                edges[self.add_node(new_state)] = cost
+            self.expansions += 1
+        for new_key, cost in edges.items():
+            self.pred[new_key][key] = cost
+        self.succ[key] = edges
+        return edges
+
+    def successors(self, key):
+        edges = self.succ.get(key)
+        return edges if edges is not None else self.expand(key)
+
+    def calculate_key(self, key):
+        g = min(self.g.get(key, INF), self.rhs.get(key, INF))
+        return (g + self.h_values[key], g)
+
+    def update_vertex(self, key):
+        if key != self.start:
+            self.rhs[key] = min((self.g.get(p, INF) + cost for p, cost in self.pred[key].items()), default=INF)
+        if self.g.get(key, INF) != self.rhs.get(key, INF):
+            entry = self.calculate_key(key)
+            self.queued[key] = entry
+            heapq.heappush(self.queue, (entry, key))
+        else:
+            self.queued.pop(key, None)
+
+    def top_key(self):
+        # drop heap entries whose vertex was re-queued or became consistent since
+        queue, queued = self.queue, self.queued
+        while queue and queued.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+        return queue[0][0] if queue else (INF, INF)
+
+    def compute_shortest_path(self):
+        g, rhs = self.g, self.rhs
+        while (self.top_key() < self.calculate_key(GOAL) or rhs.get(GOAL, INF) != g.get(GOAL, INF)) and self.queue:
+            _, key = heapq.heappop(self.queue)
+            del self.queued[key]
+            if g.get(key, INF) > rhs.get(key, INF):
+                g[key] = rhs[key]
+                for new_key in self.successors(key):
+                    self.update_vertex(new_key)
+            else:
+                g[key] = INF
+                for new_key in self.successors(key):
+                    self.update_vertex(new_key)
+                self.update_vertex(key)
+
+    def best_predecessor(self, key):
+        # (predecessor, edge cost) giving the g of key, None if no predecessor is settled
+        best, best_cost, best_g = None, None, INF
+        for p, cost in self.pred[key].items():
+            g = self.g.get(p, INF) + cost
+            if g < best_g:
+                best, best_cost, best_g = p, cost, g
+        return best, best_cost
+
+    def path(self):
+        # walk back from the goal through the predecessors that give each g
+        if self.g.get(GOAL, INF) == INF:
+            return None
+        key = self.best_predecessor(GOAL)[0]
+        path = []
+        while key != self.start:
+            p, cost = self.best_predecessor(key)
+            if p is None:
+                return None
+            path.append((self.states[key], cost))
+            key = p
+        path.append((self.states[self.start], 0))
+        path.reverse()
+        return path
+
+    def replan(self, start=None):
+        # best path from `start` (default: the current start) under the current layout
+        if self.track.token != self.token:
+            # the layout changed without set_segment (e.g. regenerate), nothing can be reused
+            start = start if start is not None else self.states[self.start]
+            self.clear_graph()
+            self.token = self.track.token
+            self.reset(start)
+        elif start is not None and pack_state(start) != self.start:
+            self.reset(start)
+        self.compute_shortest_path()
+        return self.path()
+
+    def segment_changed(self, track, position, old_code, new_code):
+        self.token = track.token
+        keys = self.at_position.get(position, ())
+        affected = set()
+
+        # the step into a state at `position` is charged for the segment there
+        for key in keys:
+            if key == GOAL:
+                continue
+            cost = step_cost(track, self.states[key])
+            for p in self.pred[key]:
+                self.pred[key][p] = cost
+                self.succ[p][key] = cost
+            affected.add(key)
+
+        # and moving on from it applies that segment's effect, so its successors change
+        for key in keys:
+            edges = self.succ.get(key)
+            if edges is None or self.states[key][0] >= self.goal:
+                continue
+            for new_key in edges:
+                del self.pred[new_key][key]
+            affected.update(edges)
+            affected.update(self.expand(key))
+
+        for key in affected:
+            self.update_vertex(key)
+
+def lpa_star(environment, goal, visualizer=None, h=None):
+    planner = LPAStar(environment, goal, h=h, visualizer=visualizer)
+    try:
+        return planner.replan()
+    finally:
+        planner.close()
+
+def main():
+    env = Environment(track_length=30)
+    visualizer = Visualizer()
+    planner = LPAStar(env, env.track.length - 1, visualizer=visualizer)
+    solution = planner.replan()
+    print("Initial plan: cost %s, %d expansions" % (sum(cost for _, cost in solution), planner.expansions))
+
+    # an obstacle appears halfway along the planned path
+    position = solution[len(solution) // 2][0][0]
+    env.track.set_segment(position, OBSTACLE_CODES[0])
+    expansions = planner.expansions
+    solution = planner.replan()
+    print("Replanned: cost %s, %d more expansions" % (sum(cost for _, cost in solution), planner.expansions - expansions))
+    planner.close()
+
+    visualize(solution, env.track.length)
+    visualizer.show_graph(solution)
+
+if __name__ == "__main__":
+    main()
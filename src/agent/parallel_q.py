@@ -0,0 +1,125 @@
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.agent.q_table import QTable
+from src.environment.envQ import Environment
+from src.environment.track import Track
+
+# Q-learning over a process pool. Training runs in rounds: every round's episodes are
+# split over a fixed number of shards, each of which continues from the same copy of the
+# table and plays its episodes on a worker's own Environment over the same track; the
+# master merges the shard tables (see merge_tables) and hands the result to the next
+# round. Shards within a round are independent, so the pool scales with the number of
+# cores, and fewer, longer rounds mean less time spent shipping tables between processes.
+#
+# Each shard seeds the random module from (seed, round, shard), and the master merges
+# the shards in order, so a run depends on its arguments only: not on how the pool
+# schedules the tasks, nor on the number of workers, which only decides how the shards
+# are grouped into tasks. Changing `shards` changes the training.
+
+SHARDS = 16
+
+# filled in each worker by init_worker
+_env = None
+_q_learning = None
+
+def init_worker(codes):
+    global _env, _q_learning
+    track = Track.from_codes(array('B', codes))
+    _env = Environment(track.length, track=track)
+    _q_learning = importlib.import_module("src.agent.Q-Learning").q_learning
+
+def run_shards(values, shards, alpha, gamma, epsilon, speed_step, battery_step):
+    # [(values, visited), ...] after each (episodes, seed) shard's episodes, every shard
+    # starting from `values`; visited marks the cells the shard updated
+    results = []
+    for episodes, seed in shards:
+        random.seed(seed)
+        table = QTable(_env.track.length, speed_step, battery_step, values=values.copy())
+        _q_learning(_env, episodes, alpha, gamma, epsilon, table=table)
+        results.append((table.values, table.visited))
+    return results
+
+def merge_tables(table, results):
+    # each cell becomes the mean over the shards that updated it this round; cells no
+    # shard reached keep their value. A plain mean over all shards would pull rarely
+    # visited cells back towards the old value once per shard that never saw them
+    rows = table.rows
+    counts = np.zeros(len(rows), dtype=np.int64)
+    totals = np.zeros_like(rows)
+    for values, visited in results:
+        counts += visited
+        totals[visited] += values.reshape(rows.shape)[visited]
+    updated = counts > 0
+    rows[updated] = totals[updated] / counts[updated, None]
+    table.visited |= updated
+
+def split(episodes, parts):
+    # `episodes` as evenly as possible over `parts`
+    base, extra = divmod(episodes, parts)
+    return [base + (i < extra) for i in range(parts)]
+
+def parallel_q_learning(env, episodes, workers=None, rounds=10, seed=0, alpha=0.1, gamma=0.9, epsilon=0.1,
+                        speed_step=0.5, battery_step=5, table=None, shards=SHARDS):
+    # same training as q_learning(env, episodes, ...) spread over `workers` processes
+    # (default: one per core, at most one per shard), merging the tables `rounds` times
+    workers = min(workers or os.cpu_count() or 1, shards)
+    Q = table if table is not None else QTable(env.track.length, speed_step, battery_step)
+    codes = bytes(env.track.codes[:env.track.length])
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(codes,)) as pool:
+        for round_index, round_episodes in enumerate(split(episodes, rounds)):
+            tasks = [(count, "%s:%d:%d" % (seed, round_index, shard))
+                     for shard, count in enumerate(split(round_episodes, shards))]
+            # consecutive shards per task, so the results come back in shard order
+            groups, start = [], 0
+            for size in split(len(tasks), workers):
+                groups.append(tasks[start:start + size])
+                start += size
+            futures = [pool.submit(run_shards, Q.values, group, alpha, gamma, epsilon, speed_step, battery_step)
+                       for group in groups if group]
+            merge_tables(Q, [result for future in futures for result in future.result()])
+    return Q
+
+def greedy_return(table, env, max_steps=None):
+    # (total reward, reached the end) following the table greedily from the start
+    max_steps = max_steps or 10 * env.track.length
+    env.reset()
+    state = env.get_state()
+    total, done = 0, False
+    for _ in range(max_steps):
+        state, reward, done = env.step(table.best_action(state))
+        total += reward
+        if done:
+            break
+    return total, state[0] >= env.track.length
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.agent.parallel_q",
+                                     description="Train a Q-table over a process pool.")
+    parser.add_argument("--length", type=int, default=100)
+    parser.add_argument("--track-seed", type=int, default=0)
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=SHARDS, help="independent episode streams per round")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the episode randomness")
+    args = parser.parse_args(argv)
+
+    env = Environment(args.length, track=Track.from_seed(args.length, args.track_seed))
+    start = time.perf_counter()
+    table = parallel_q_learning(env, args.episodes, args.workers, args.rounds, args.seed, shards=args.shards)
+    elapsed = time.perf_counter() - start
+    total, reached = greedy_return(table, env)
+    print("%d episodes in %.1fs, %d cells visited; greedy run: reward %.1f, %s" % (
+        args.episodes, elapsed, table.visited.sum(), total, "goal reached" if reached else "failed"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
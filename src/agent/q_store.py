@@ -0,0 +1,61 @@
+import mmap
+import struct
+import numpy as np
+from src.agent.q_table import ACTIONS, GreedyPolicy, Grid, QTable
+
+# file layout, little endian:
+#   header  magic b"RQTB", version u16, value dtype char (b"d" or b"f"), 1 byte padding,
+#           track length u64, speed step f64, battery step f64
+#   body    the Q-values, len(ACTIONS) per cell in cell order (see QTable.cell),
+#           then the visited mask, one byte per cell,
+#           then the greedy action index of every cell, one byte per cell
+# The greedy actions are stored so that load_policy only touches the last two sections
+# of the mapping, not the values.
+MAGIC = b"RQTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHcxQdd")
+
+def save_table(path, table):
+    dtype = table.values.dtype.newbyteorder("<")
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, dtype.char.encode(), table.track_length,
+                            table.speed_step, table.battery_step))
+        f.write(np.ascontiguousarray(table.values, dtype=dtype).tobytes())
+        f.write(table.visited.astype(np.uint8).tobytes())
+        f.write(table.greedy().astype(np.uint8).tobytes())
+
+def open_store(path, writable=False):
+    # (mapping, header fields, value dtype, offsets of the values, visited and action sections)
+    # writable maps copy-on-write: the arrays can be trained further, the file never changes
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+
+    magic, version, char, track_length, speed_step, battery_step = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a version %d Q-table file" % (path, VERSION))
+    dtype = np.dtype(char.decode()).newbyteorder("<")
+
+    grid = Grid(track_length, speed_step, battery_step)
+    values_offset = HEADER.size
+    visited_offset = values_offset + grid.size * len(ACTIONS) * dtype.itemsize
+    actions_offset = visited_offset + grid.size
+    if len(data) != actions_offset + grid.size:
+        raise ValueError("%s is truncated or does not match its header" % path)
+    return data, grid, dtype, (values_offset, visited_offset, actions_offset)
+
+def load_table(path, writable=False):
+    # the values and visited mask are views into the mapped file, so loading copies
+    # nothing; read-only unless writable
+    data, grid, dtype, (values_offset, visited_offset, _) = open_store(path, writable)
+    values = np.frombuffer(data, dtype, grid.size * len(ACTIONS), values_offset)
+    visited = np.frombuffer(data, np.bool_, grid.size, visited_offset)
+    return QTable(grid.track_length, grid.speed_step, grid.battery_step,
+                  values=values.reshape(grid.shape + (len(ACTIONS),)), visited=visited)
+
+def load_policy(path):
+    # the compiled greedy policy, as views into a read-only mapping of the file;
+    # processes serving the same file share its pages
+    data, grid, _, (_, visited_offset, actions_offset) = open_store(path)
+    return GreedyPolicy(grid.track_length, grid.speed_step, grid.battery_step,
+                        actions=np.frombuffer(data, np.uint8, grid.size, actions_offset),
+                        visited=np.frombuffer(data, np.bool_, grid.size, visited_offset))
@@ -0,0 +1,130 @@
+import numpy as np
+from src.environment.car import Car
+
+ACTIONS = ["accelerate", "decelerate", "recharge", "move"]
+ACTION_INDEX = {action: index for index, action in enumerate(ACTIONS)}
+
+class Grid:
+    # (position, speed, battery) grid of a Q-table. Positions are exact (past the end
+    # clamps to track_length); speed and battery are rounded to the nearest multiple of
+    # speed_step and battery_step. Coins don't affect the dynamics and are left out of
+    # the state. cell() numbers the cells 0..n-1 in C order of shape.
+    def __init__(self, track_length, speed_step=0.5, battery_step=5):
+        self.track_length = track_length
+        self.speed_step = speed_step
+        self.battery_step = battery_step
+        self.shape = (track_length + 1,
+                      int(round(Car.MAX_SPEED / speed_step)) + 1,
+                      int(round(Car.MAX_BATTERY / battery_step)) + 1)
+        self.size = self.shape[0] * self.shape[1] * self.shape[2]
+
+    def cell(self, state):
+        _, speeds, batteries = self.shape
+        position = min(state[0], self.track_length)
+        speed = min(int(state[1] / self.speed_step + 0.5), speeds - 1)
+        battery = min(max(int(state[2] / self.battery_step + 0.5), 0), batteries - 1)
+        return (position * speeds + speed) * batteries + battery
+
+    def cells(self, states):
+        # cell() over an (n, >=3) array of states
+        states = np.asarray(states, dtype=np.float64)
+        _, speeds, batteries = self.shape
+        positions = np.minimum(states[:, 0].astype(np.int64), self.track_length)
+        speed = np.minimum((states[:, 1] / self.speed_step + 0.5).astype(np.int64), speeds - 1)
+        battery = np.clip((states[:, 2] / self.battery_step + 0.5).astype(np.int64), 0, batteries - 1)
+        return (positions * speeds + speed) * batteries + battery
+
+class QTable(Grid):
+    # dense Q-values over a Grid, one row of len(ACTIONS) values per cell.
+    #
+    # values has shape grid + (len(ACTIONS),); rows is the same memory as one row per
+    # cell, addressed by the flat cell number cell() returns. Whole-table work goes
+    # through the arrays; the per-step calls go through flat, a memoryview of the same
+    # buffer, since indexing it gives plain floats instead of NumPy scalars. values and
+    # visited may be read-only, e.g. mapped from a file by q_store.load_table
+    def __init__(self, track_length, speed_step=0.5, battery_step=5, dtype=np.float64, values=None, visited=None):
+        super().__init__(track_length, speed_step, battery_step)
+        if values is None:
+            values = np.zeros(self.shape + (len(ACTIONS),), dtype=dtype)
+        elif values.shape != self.shape + (len(ACTIONS),):
+            raise ValueError("values of shape %s do not fit a %s grid" % (values.shape, self.shape))
+        self.values = values
+        self.rows = values.reshape(-1, len(ACTIONS))
+        self.flat = memoryview(values).cast('B').cast(values.dtype.char)
+        # cells that got at least one update, so callers can tell "all zero" from "never seen"
+        self.visited = visited if visited is not None else np.zeros(self.size, dtype=bool)
+        self.visited_flags = memoryview(self.visited).cast('B')
+
+    def seen(self, state):
+        return bool(self.visited_flags[self.cell(state)])
+
+    def action_values(self, cell):
+        n = len(ACTIONS)
+        return self.flat[cell * n:cell * n + n].tolist()
+
+    def best_action_index(self, cell):
+        q = self.action_values(cell)
+        return q.index(max(q))
+
+    def best_action(self, state):
+        return ACTIONS[self.best_action_index(self.cell(state))]
+
+    def best_value(self, state):
+        return max(self.action_values(self.cell(state)))
+
+    def update(self, state, action, reward, new_state, done, alpha=0.1, gamma=0.9):
+        self.update_cell(self.cell(state), ACTION_INDEX[action], reward, self.cell(new_state), done, alpha, gamma)
+
+    def update_cell(self, cell, action, reward, new_cell, done, alpha=0.1, gamma=0.9):
+        # one TD(0) step on Q(cell, action index) in place; terminal states don't bootstrap
+        target = reward if done else reward + gamma * max(self.action_values(new_cell))
+        i = cell * len(ACTIONS) + action
+        self.flat[i] += alpha * (target - self.flat[i])
+        self.visited_flags[cell] = 1
+
+    def update_batch(self, cells, actions, rewards, new_cells, dones, alpha=0.1, gamma=0.9, weights=None):
+        # TD(0) on a minibatch at once, every target from the values before the batch;
+        # np.add.at sums the steps of a (cell, action) pair that occurs more than once.
+        # Returns the TD errors, e.g. for ReplayBuffer.update_priorities
+        targets = rewards + gamma * np.where(dones, 0.0, self.rows[new_cells].max(axis=1))
+        td_errors = targets - self.rows[cells, actions]
+        steps = alpha * td_errors if weights is None else alpha * weights * td_errors
+        np.add.at(self.rows, (cells, actions), steps)
+        self.visited[cells] = True
+        return td_errors
+
+    def greedy(self):
+        # argmax action index of every cell at once, one entry per cell
+        return self.rows.argmax(axis=1)
+
+class GreedyPolicy(Grid):
+    # the greedy policy of a QTable compiled down to one action index per cell (uint8) and
+    # the visited mask, so a query is a cell() and a byte lookup. Has the seen/best_action
+    # interface of QTable, and the arrays may be read-only views, e.g. from q_store.load_policy
+    def __init__(self, track_length, speed_step=0.5, battery_step=5, actions=None, visited=None):
+        super().__init__(track_length, speed_step, battery_step)
+        self.actions = actions if actions is not None else np.zeros(self.size, dtype=np.uint8)
+        self.visited = visited if visited is not None else np.zeros(self.size, dtype=bool)
+        if len(self.actions) != self.size or len(self.visited) != self.size:
+            raise ValueError("policy arrays do not fit a %s grid" % (self.shape,))
+        self.action_codes = memoryview(self.actions).cast('B')
+        self.visited_flags = memoryview(self.visited).cast('B')
+
+    @classmethod
+    def from_table(cls, table):
+        return cls(table.track_length, table.speed_step, table.battery_step,
+                   table.greedy().astype(np.uint8), table.visited.copy())
+
+    def seen(self, state):
+        return bool(self.visited_flags[self.cell(state)])
+
+    def best_action_index(self, cell):
+        return self.action_codes[cell]
+
+    def best_action(self, state):
+        return ACTIONS[self.action_codes[self.cell(state)]]
+
+    def best_actions(self, states):
+        # action indices for an (n, >=3) array of states, with a mask of the ones never trained on
+        cells = self.cells(states)
+        return self.actions[cells], self.visited[cells]
@@ -0,0 +1,39 @@
+import importlib
+
+# agent name -> (module, search function); a module is only imported when its agent is used.
+# Every search function is called as fn(environment, goal, visualizer=...).
+AGENTS = {
+    "astar": ("src.agent.astar_agent", "astar"),
+    "anytime_astar": ("src.agent.astar_agent", "anytime_astar"),
+    "ucs": ("src.agent.ucs_agent", "ucs"),
+    "greedy": ("src.agent.gbfs_agent", "greedy"),
+    "beam": ("src.agent.beam_agent", "beam_search"),
+    "lpa_star": ("src.agent.lpa_star_agent", "lpa_star"),
+    "bfs": ("src.agent.bfs_agent", "bfs"),
+    "dfs": ("src.agent.dfs_agent", "dfs"),
+    "ids": ("src.agent.ids_agent", "ids"),
+    "ida_star": ("src.agent.ida_star_agent", "ida_star"),
+    "hill_climb": ("src.agent.hill_climb", "hill_climb"),
+    "simulated_annealing": ("src.agent.simulated_annealing", "simulated_annealing"),
+    "genetic": ("src.agent.genetic_agent", "genetic_algorithm"),
+}
+
+def register(name, module, function):
+    AGENTS[name] = (module, function)
+
+def get_agent(name):
+    if name not in AGENTS:
+        raise KeyError("unknown agent %r, expected one of %s" % (name, ", ".join(sorted(AGENTS))))
+    module, function = AGENTS[name]
+    return getattr(importlib.import_module(module), function)
+
+def solution_states(solution):
+    # bfs and dfs return bare states, the other agents (state, step cost) pairs
+    if solution and isinstance(solution[0][0], tuple):
+        return [state for state, cost in solution]
+    return list(solution or [])
+
+def solution_cost(solution):
+    if solution and isinstance(solution[0][0], tuple):
+        return sum(cost for state, cost in solution)
+    return None
@@ -0,0 +1,124 @@
+import numpy as np
+
+class SumTree:
+    # binary tree over `capacity` non-negative values where every inner node holds the sum
+    # of its children, in one array: node 1 is the root, node i has children 2i and 2i+1,
+    # and the leaves (the values) start at `leaves`. Changing a value and finding the
+    # value a prefix sum falls in both take O(log capacity); the batch versions do one
+    # NumPy operation per tree level.
+    def __init__(self, capacity):
+        self.leaves = 1
+        self.levels = 0
+        while self.leaves < capacity:
+            self.leaves *= 2
+            self.levels += 1
+        self.nodes = np.zeros(2 * self.leaves)
+
+    def total(self):
+        return self.nodes[1]
+
+    def get(self, indices):
+        return self.nodes[self.leaves + indices]
+
+    def set(self, index, value):
+        nodes = self.nodes
+        node = self.leaves + index
+        nodes[node] = value
+        node //= 2
+        while node:
+            # re-add the children rather than apply the difference, so no rounding drift builds up
+            nodes[node] = nodes[2 * node] + nodes[2 * node + 1]
+            node //= 2
+
+    def set_batch(self, indices, values):
+        nodes = self.nodes
+        node = self.leaves + indices
+        nodes[node] = values
+        node >>= 1
+        while node[0]:
+            # a parent listed twice just gets the same sum twice
+            nodes[node] = nodes[2 * node] + nodes[2 * node + 1]
+            node >>= 1
+
+    def find(self, prefix_sums):
+        # leaf index of each prefix sum in [0, total()): the first leaf whose running
+        # sum goes past it
+        nodes = self.nodes
+        node = np.ones(len(prefix_sums), dtype=np.int64)
+        remaining = np.array(prefix_sums, dtype=np.float64)
+        for _ in range(self.levels):
+            node <<= 1
+            left = nodes[node]
+            right = remaining >= left
+            remaining -= left * right
+            node += right
+        return node - self.leaves
+
+class ReplayBuffer:
+    # fixed-capacity circular store of (state, action, reward, new_state, done) in
+    # preallocated arrays; once full, each add overwrites the oldest transition.
+    # With prioritized=True, sample() draws transitions with probability proportional to
+    # priority ** alpha (new ones get the current maximum, so each is seen at least once
+    # soon) and returns importance weights that undo the bias, scaled by beta. The scaled
+    # priorities live in a SumTree, so sampling and priority updates are O(log capacity)
+    # per transition instead of a pass over the whole buffer.
+    def __init__(self, capacity, state_size=3, prioritized=False, alpha=0.6, beta=0.4, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros((capacity, state_size))
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self.new_states = np.zeros((capacity, state_size))
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity)
+        self.tree = SumTree(capacity) if prioritized else None
+
+        self.next = 0
+        self.size = 0
+        self.max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, new_state, done):
+        i = self.next
+        n = self.states.shape[1]
+        self.states[i] = state[:n]
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.new_states[i] = new_state[:n]
+        self.dones[i] = done
+        self.priorities[i] = self.max_priority
+        if self.prioritized:
+            self.tree.set(i, self.max_priority ** self.alpha)
+        self.next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        # (indices, states, actions, rewards, new_states, dones, weights); weights are all 1
+        # for uniform sampling
+        if self.prioritized:
+            total = self.tree.total()
+            indices = self.tree.find(self.rng.random(batch_size) * total)
+            # rounding can carry a prefix sum just past the last transition, onto an empty leaf
+            indices = np.minimum(indices, self.size - 1)
+            probabilities = self.tree.get(indices) / total
+            weights = (self.size * probabilities) ** -self.beta
+            weights /= weights.max()
+        else:
+            indices = self.rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size)
+        return (indices, self.states[indices], self.actions[indices], self.rewards[indices],
+                self.new_states[indices], self.dones[indices], weights)
+
+    def update_priorities(self, indices, td_errors, epsilon=1e-3):
+        # priority of each sampled transition becomes its latest |TD error| (plus epsilon
+        # so none drops out of sampling)
+        priorities = np.abs(td_errors) + epsilon
+        self.priorities[indices] = priorities
+        self.tree.set_batch(indices, priorities ** self.alpha)
+        self.max_priority = max(self.max_priority, priorities.max())
@@ -0,0 +1,39 @@
+from array import array
+
+# search tree for the environment-based searches: node i holds states[i], reached from
+# parents[i] by a step costing costs[i], with g[i] the total cost from the root (node 0).
+# Frontier entries only carry node ids, the path is rebuilt once when a goal is reached.
+
+class SearchTree:
+    def __init__(self, root):
+        self.states = [root]
+        self.parents = array('l', [-1])
+        self.costs = array('d', [0])
+        self.g = array('d', [0])
+
+    def __len__(self):
+        return len(self.states)
+
+    def add(self, state, parent, cost):
+        self.states.append(state)
+        self.parents.append(parent)
+        self.costs.append(cost)
+        self.g.append(self.g[parent] + cost)
+        return len(self.states) - 1
+
+    def path(self, node):
+        # [(state, step cost), ...] from the root, the root with cost 0
+        path = []
+        while node != -1:
+            path.append((self.states[node], self.costs[node]))
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+    def state_path(self, node):
+        return [state for state, cost in self.path(node)]
+
+class SearchLimitReached(Exception):
+    # a search stopped because it used up its node budget (max_nodes), which says nothing
+    # about whether a solution exists
+    pass
@@ -0,0 +1,253 @@
+import argparse
+import importlib
+import random
+import sys
+import time
+import numpy as np
+from src.agent.q_table import ACTIONS, Grid
+from src.environment.envQ import Environment
+from src.environment.track import SEGMENTS, SEGMENT_CODES, Track
+from src.environment.vector_env import batch_drive, batch_reward
+
+# the envQ race as an MDP over random tracks. Track segments are drawn independently per
+# position (see track.random_code), and the car never comes back to a position, so the
+# segment under the car is all it needs to know about the layout: a state is
+# (position, speed, battery, code of the segment at position), and the code of the
+# segment it arrives on is drawn from the distribution at the new position. Solving it
+# gives the policy that is best in expectation over every track the generator makes.
+#
+# Speed and battery live on the QTable grid (q_table.Grid). The dynamics and rewards are
+# computed exactly from the grid points with batch_drive/batch_reward, and the state the
+# car lands in is spread over the four surrounding grid points by linear interpolation,
+# so small changes such as the battery drain of one move are not rounded away.
+#
+# Every move advances the car, so the MDP is a DAG over positions, and the solvers sweep
+# it from the end (see sweep).
+
+def segment_distribution(length):
+    # (length, len(SEGMENTS)) probabilities of each code at each position under random_code
+    # (a type uniformly, then a code of that type uniformly)
+    def row(types):
+        probabilities = np.zeros(len(SEGMENTS))
+        for segment_type in types:
+            codes = SEGMENT_CODES[segment_type]
+            probabilities[codes] += 1 / (len(types) * len(codes))
+        return probabilities
+
+    distribution = np.empty((length, len(SEGMENTS)))
+    distribution[:length // 2] = row(['terrain', 'reward'])
+    distribution[length // 2:] = row(['terrain', 'obstacle', 'reward'])
+    return distribution
+
+def interpolation(x, step, n):
+    # (lower grid index, weight of the next one up) placing x between two of n grid points
+    t = np.clip(x / step, 0, n - 1)
+    lower = np.minimum(t.astype(np.int64), n - 2)
+    return lower, t - lower
+
+class TrackMDP:
+    def __init__(self, length, speed_step=0.5, battery_step=5, gamma=0.9):
+        self.length = length
+        self.gamma = gamma
+        self.grid = Grid(length, speed_step, battery_step)
+        _, speeds, batteries = self.grid.shape
+        codes = len(SEGMENTS)
+        # states (position, speed index, battery index, code), positions 0..length-1;
+        # arrays below have one more axis for the action
+        self.shape = (length, speeds, batteries, codes)
+        self.distribution = segment_distribution(length)
+
+        # one move from every grid point, code and action; none of it depends on the position
+        speed, battery, code, action = np.meshgrid(np.arange(speeds) * speed_step, np.arange(batteries) * battery_step,
+                                                   np.arange(codes), np.arange(len(ACTIONS)), indexing='ij')
+        speed, battery, advance = batch_drive(speed, battery, action, code)
+        stopped = (battery <= 0) | (speed == 0)
+
+        # the four grid points around where the car lands, as flat (speed, battery) indices
+        speed_index, speed_weight = interpolation(speed, speed_step, speeds)
+        battery_index, battery_weight = interpolation(battery, battery_step, batteries)
+        base = speed_index * batteries + battery_index
+        self.corner_index = np.stack([base, base + 1, base + batteries, base + batteries + 1], axis=-1)
+        self.corner_weight = np.stack([(1 - speed_weight) * (1 - battery_weight), (1 - speed_weight) * battery_weight,
+                                       speed_weight * (1 - battery_weight), speed_weight * battery_weight], axis=-1)
+
+        # positions past the end all map to row `length`, which holds value 0
+        position = np.arange(length).reshape(-1, 1, 1, 1, 1) + advance
+        self.next_position = np.minimum(position, length)
+        self.done = (position >= length) | stopped
+
+        # the reward is charged on the segment the car arrives on; take its expectation
+        position, speed, battery = np.broadcast_arrays(position, speed, battery)
+        arrival = self.distribution[np.minimum(position, length - 1)]
+        self.rewards = np.zeros(position.shape)
+        for next_code in range(codes):
+            reward = batch_reward(position.ravel(), speed.ravel(), battery.ravel(), next_code, length)
+            self.rewards += arrival[..., next_code] * reward.reshape(position.shape)
+
+    def arrival_value(self, values, position):
+        # value of arriving at `position` before its segment is known, per flat
+        # (speed, battery) grid point
+        return values[position].reshape(-1, len(SEGMENTS)) @ self.distribution[position]
+
+    def arrival_values(self, values):
+        # arrival_value of every position, with a row of zeros for past the end
+        expected = np.einsum('pc,psbc->psb', self.distribution, values).reshape(self.length, -1)
+        return np.vstack([expected, np.zeros((1, expected.shape[1]))])
+
+    def backup(self, arrival, positions=slice(None), policy=None):
+        # Bellman backup of the states at `positions` (an index or a slice) from the arrival
+        # values of the positions after them: the value of every action or, given the
+        # policy's actions for those states, of the action it picks
+        next_position, rewards, done = self.next_position[positions], self.rewards[positions], self.done[positions]
+        corner_index = np.broadcast_to(self.corner_index, next_position.shape + (4,))
+        corner_weight = np.broadcast_to(self.corner_weight, next_position.shape + (4,))
+        if policy is not None:
+            actions = policy[..., None]
+            next_position = np.take_along_axis(next_position, actions, -1)
+            rewards = np.take_along_axis(rewards, actions, -1)
+            done = np.take_along_axis(done, actions, -1)
+            corner_index = np.take_along_axis(corner_index, actions[..., None], -2)
+            corner_weight = np.take_along_axis(corner_weight, actions[..., None], -2)
+        expected = (arrival[next_position[..., None], corner_index] * corner_weight).sum(axis=-1)
+        q = rewards + self.gamma * np.where(done, 0, expected)
+        return q if policy is None else q[..., 0]
+
+    def q_values(self, values, policy=None):
+        # backup() of every state from a full table of values
+        return self.backup(self.arrival_values(values), policy=policy)
+
+    def start_value(self, values):
+        # expected value at the start line (position 0, speed 1, battery 100) over the first segment
+        cell = self.grid.cell((0, 1, 100))
+        return float(self.distribution[0] @ values.reshape(-1, len(SEGMENTS))[cell])
+
+class Solution:
+    def __init__(self, mdp, values, policy, iterations, sweeps, residual, seconds):
+        self.mdp = mdp
+        self.values = values
+        # action index per state, shape mdp.shape
+        self.policy = policy
+        self.iterations = iterations
+        self.sweeps = sweeps
+        self.residual = residual
+        self.seconds = seconds
+
+    def start_value(self):
+        return self.mdp.start_value(self.values)
+
+    def best_action(self, state, code):
+        # action in `state` (nearest grid point) on the segment with `code`
+        return ACTIONS[self.policy.reshape(-1, len(SEGMENTS))[self.mdp.grid.cell(state), code]]
+
+def sweep(mdp, values, arrival, policy=None):
+    # one Gauss-Seidel sweep over the positions from the last back to the first, so every
+    # backup already sees the new values of the positions after it; as moves only go
+    # forward, a single sweep is exact and the next one just confirms it. Updates values
+    # and arrival in place and returns (largest change, greedy actions or None with a policy)
+    residual = 0.0
+    greedy = np.empty(mdp.shape, dtype=np.uint8) if policy is None else None
+    for position in reversed(range(mdp.length)):
+        if policy is None:
+            q = mdp.backup(arrival, position)
+            greedy[position] = q.argmax(axis=-1)
+            new_values = q.max(axis=-1)
+        else:
+            new_values = mdp.backup(arrival, position, policy[position])
+        residual = max(residual, float(np.abs(new_values - values[position]).max()))
+        values[position] = new_values
+        arrival[position] = mdp.arrival_value(values, position)
+    return residual, greedy
+
+def value_iteration(mdp, tol=1e-6, max_sweeps=100):
+    # Bellman sweeps until no value moves by more than tol
+    start = time.perf_counter()
+    values = np.zeros(mdp.shape)
+    arrival = mdp.arrival_values(values)
+    for iteration in range(1, max_sweeps + 1):
+        residual, policy = sweep(mdp, values, arrival)
+        if residual < tol:
+            break
+    return Solution(mdp, values, policy, iteration, iteration, residual, time.perf_counter() - start)
+
+def evaluate_policy(mdp, policy, values, arrival, tol=1e-6, max_sweeps=100):
+    # value of `policy` into values/arrival, by sweeps until they move by less than tol;
+    # returns the number of sweeps
+    for count in range(1, max_sweeps + 1):
+        residual, _ = sweep(mdp, values, arrival, policy)
+        if residual < tol:
+            break
+    return count
+
+def policy_iteration(mdp, tol=1e-6, max_iterations=100):
+    # evaluate, improve greedily, repeat until the policy stops changing. An action is only
+    # replaced by one that is better by more than tol, so ties can't make it cycle
+    start = time.perf_counter()
+    policy = np.zeros(mdp.shape, dtype=np.uint8)
+    values = np.zeros(mdp.shape)
+    arrival = mdp.arrival_values(values)
+    sweeps = 0
+    for iteration in range(1, max_iterations + 1):
+        sweeps += evaluate_policy(mdp, policy, values, arrival, tol)
+        q = mdp.backup(arrival)
+        current = np.take_along_axis(q, policy[..., None], -1)[..., 0]
+        improve = q.max(axis=-1) > current + tol
+        if not improve.any():
+            break
+        policy = np.where(improve, q.argmax(axis=-1), policy).astype(np.uint8)
+    residual = float(np.abs(mdp.backup(arrival, policy=policy) - values).max())
+    return Solution(mdp, values, policy, iteration, sweeps, residual, time.perf_counter() - start)
+
+def rollout(env, choose, gamma=0.9, max_steps=None):
+    # (discounted return, reached the end) of one run from the start line; choose(state)
+    # gives the action
+    max_steps = max_steps or 10 * env.track.length
+    env.reset()
+    state = env.get_state()
+    total, discount = 0.0, 1.0
+    for _ in range(max_steps):
+        state, reward, done = env.step(choose(state))
+        total += discount * reward
+        discount *= gamma
+        if done:
+            break
+    return total, state[0] >= env.track.length
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.agent.track_mdp",
+                                     description="Solve the random-track MDP and compare with Q-learning.")
+    parser.add_argument("--length", type=int, default=100)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--tracks", type=int, default=5, help="random tracks to evaluate the policies on")
+    parser.add_argument("--episodes", type=int, default=2000, help="Q-learning episodes per track")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    mdp = TrackMDP(args.length, gamma=args.gamma)
+    print("MDP: %d states x %d actions, built in %.2fs" % (np.prod(mdp.shape), len(ACTIONS), time.perf_counter() - start))
+    vi = value_iteration(mdp, args.tol)
+    print("value iteration:  %d sweeps, residual %.2g, %.2fs, start value %.3f" % (
+        vi.sweeps, vi.residual, vi.seconds, vi.start_value()))
+    pi = policy_iteration(mdp, args.tol)
+    print("policy iteration: %d iterations (%d sweeps), residual %.2g, %.2fs, start value %.3f" % (
+        pi.iterations, pi.sweeps, pi.residual, pi.seconds, pi.start_value()))
+    print("max value difference %.2g" % np.abs(vi.values - pi.values).max())
+
+    # the solved policy knows the segment distribution but not the layout; Q-learning is
+    # trained on each evaluation track itself
+    q_learning = importlib.import_module("src.agent.Q-Learning").q_learning
+    for seed in range(args.tracks):
+        env = Environment(args.length, track=Track.from_seed(args.length, seed))
+        mdp_return, mdp_reached = rollout(env, lambda state: vi.best_action(state, env.track.get_code(state[0])), args.gamma)
+        random.seed(seed)
+        start = time.perf_counter()
+        table = q_learning(env, args.episodes, gamma=args.gamma)
+        seconds = time.perf_counter() - start
+        q_return, q_reached = rollout(env, table.best_action, args.gamma)
+        print("track %d: MDP policy %8.2f%s   Q-learning (%d episodes, %.1fs) %8.2f%s" % (
+            seed, mdp_return, "" if mdp_reached else " (failed)",
+            args.episodes, seconds, q_return, "" if q_reached else " (failed)"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,17 @@
-import pydot
-import networkx as nx
-from IPython.display import Image, display
-
 class Visualizer:
+    # networkx, pydot and IPython are imported here rather than at module level,
+    # so agents can import this module without the plotting stack
     def __init__(self):
+        import networkx as nx
         self.graph = nx.DiGraph()
     
     def add_state(self, parent, child, action):
         self.graph.add_edge(parent, child, action=action)
 
     def show_graph(self, solution=None):
+        import networkx as nx
+        from IPython.display import Image, display
+
         pydot_graph = nx.nx_pydot.to_pydot(self.graph)
 
         if solution:
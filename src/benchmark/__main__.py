@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+from src.agent.registry import AGENTS
+from src.benchmark.suite import LENGTHS, SEEDS, build_corpus, run_suite, compare
+from src.environment.track_store import load_tracks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.benchmark",
+                                     description="Time the agents over a seeded track corpus.")
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS), default=sorted(AGENTS))
+    parser.add_argument("--lengths", nargs="+", type=int, default=LENGTHS)
+    parser.add_argument("--seeds", nargs="+", type=int, default=SEEDS)
+    parser.add_argument("--corpus", help="track file to use instead of --lengths/--seeds")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown against the baseline (default 0.2)")
+    args = parser.parse_args(argv)
+
+    tracks = load_tracks(args.corpus) if args.corpus else build_corpus(args.lengths, args.seeds)
+
+    def progress(result):
+        print("%-20s length %5d seed %5s  p50 %10.3f ms  solved %s" % (
+            result["agent"], result["length"], result["seed"], result["p50_ns"] / 1e6, result["solved"]),
+            file=sys.stderr)
+
+    report = run_suite(args.agents, tracks, args.repetitions, args.warmup, not args.no_memory, progress)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import argparse
+import json
+import sys
+import time
+from src.agent.astar_agent import astar
+from src.agent.beam_agent import beam_search
+from src.agent.registry import solution_cost
+from src.agent.ucs_agent import ucs
+from src.benchmark.suite import LENGTHS, SEEDS, build_corpus
+from src.environment.env import Environment
+from src.environment.track_store import load_tracks
+
+# how far beam search lands from the optimum of the A* cost model, per beam width.
+# The optimum comes from UCS: the A* heuristic is not admissible, so A* itself can
+# overshoot, and its cost is reported next to it for reference.
+
+WIDTHS = [1, 4, 16, 64]
+
+def timed(solve, *args, **kwargs):
+    start = time.perf_counter_ns()
+    solution = solve(*args, **kwargs)
+    return solution_cost(solution), time.perf_counter_ns() - start
+
+def gap(cost, optimum):
+    if cost is None or optimum is None:
+        return None
+    return (cost - optimum) / optimum if optimum else 0.0
+
+def track_gaps(track, widths=WIDTHS, goal=None):
+    goal = goal if goal is not None else track.length - 1
+    env = Environment(track.length, track=track)
+    optimum, optimum_ns = timed(ucs, env, goal)
+    astar_cost, astar_ns = timed(astar, env, goal)
+    result = {
+        "length": track.length,
+        "seed": track.seed,
+        "track": track.content_hash(),
+        "goal": goal,
+        "optimum": optimum,
+        "optimum_ns": optimum_ns,
+        "astar": {"cost": astar_cost, "gap": gap(astar_cost, optimum), "ns": astar_ns},
+        "beam": {},
+    }
+    for width in widths:
+        cost, ns = timed(beam_search, env, goal, width=width)
+        result["beam"][str(width)] = {"cost": cost, "gap": gap(cost, optimum), "ns": ns}
+    return result
+
+def summary(results, widths):
+    # mean gap and how often the optimum was hit, over the tracks with a solution
+    rows = {"astar": [r["astar"] for r in results]}
+    for width in widths:
+        rows["beam %d" % width] = [r["beam"][str(width)] for r in results]
+    table = {}
+    for name, entries in rows.items():
+        gaps = [entry["gap"] for entry in entries if entry["gap"] is not None]
+        table[name] = {
+            "solved": len(gaps),
+            "mean_gap": sum(gaps) / len(gaps) if gaps else None,
+            "max_gap": max(gaps) if gaps else None,
+            "optimal": sum(g < 1e-9 for g in gaps),
+        }
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.benchmark.gap",
+                                     description="Compare beam search against the optimum per width.")
+    parser.add_argument("--widths", nargs="+", type=int, default=WIDTHS)
+    parser.add_argument("--lengths", nargs="+", type=int, default=LENGTHS)
+    parser.add_argument("--seeds", nargs="+", type=int, default=SEEDS)
+    parser.add_argument("--corpus", help="track file to use instead of --lengths/--seeds")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    tracks = load_tracks(args.corpus) if args.corpus else build_corpus(args.lengths, args.seeds)
+    results = []
+    for track in tracks:
+        result = track_gaps(track, args.widths)
+        results.append(result)
+        print("length %5d seed %5s  optimum %8s  %s" % (
+            result["length"], result["seed"], result["optimum"],
+            "  ".join("w%s %s" % (w, b["cost"]) for w, b in result["beam"].items())), file=sys.stderr)
+
+    report = {"widths": args.widths, "summary": summary(results, args.widths), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.agent.registry import AGENTS
+from src.agent.search_tree import SearchLimitReached
+from src.benchmark.suite import LENGTHS, SEEDS, build_corpus, run_case
+from src.environment.track_store import load_tracks, save_tracks
+
+# filled in each worker by init_worker; the tracks are views into one read-only mapping
+# of the corpus file, so every worker shares the same pages
+_tracks = None
+
+class JobTimeout(Exception):
+    pass
+
+def _alarm(signum, frame):
+    raise JobTimeout()
+
+def init_worker(corpus_path, memory_limit):
+    global _tracks
+    _tracks = load_tracks(corpus_path)
+    if memory_limit:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+def run_job(job, timeout, repetitions, warmup, memory):
+    agent, track_index, seed = job
+    track = _tracks[track_index]
+    result = {"agent": agent, "length": track.length, "seed": track.seed, "run_seed": seed}
+
+    # SIGALRM only exists on Unix; elsewhere jobs run without a time limit
+    timed = timeout and hasattr(signal, "setitimer")
+    if timed:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result.update(run_case(agent, track, repetitions=repetitions, warmup=warmup, memory=memory, seed=seed))
+        result["status"] = "ok"
+    except JobTimeout:
+        result["status"] = "timeout"
+    except SearchLimitReached:
+        result["status"] = "node_limit"
+    except MemoryError:
+        result["status"] = "memory"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = repr(e)
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        # the alarm can go off between run_case starting tracemalloc and its own cleanup
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return result
+
+def run_jobs(agents, corpus_path, seeds=(0,), workers=None, timeout=None, memory_limit=None,
+             repetitions=1, warmup=0, memory=False):
+    # yields one result dict per (agent, track, seed) job as soon as it finishes
+    count = len(load_tracks(corpus_path))
+    jobs = [(agent, index, seed) for agent in agents for index in range(count) for seed in seeds]
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(corpus_path, memory_limit)) as pool:
+        futures = [pool.submit(run_job, job, timeout, repetitions, warmup, memory) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.benchmark.pool",
+                                     description="Run agents over a track corpus on every core.")
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS), default=sorted(AGENTS))
+    parser.add_argument("--lengths", nargs="+", type=int, default=LENGTHS)
+    parser.add_argument("--seeds", nargs="+", type=int, default=SEEDS, help="track seeds")
+    parser.add_argument("--corpus", help="track file to use instead of --lengths/--seeds")
+    parser.add_argument("--run-seeds", nargs="+", type=int, default=[0],
+                        help="random seeds for the randomised agents, one job each")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--timeout", type=float, help="seconds per job")
+    parser.add_argument("--memory-mb", type=int, help="address space cap per worker")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="also measure peak memory per job")
+    parser.add_argument("--output", help="append JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    corpus_path = args.corpus
+    if corpus_path is None:
+        handle, corpus_path = tempfile.mkstemp(suffix=".trk")
+        os.close(handle)
+        save_tracks(corpus_path, build_corpus(args.lengths, args.seeds))
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in run_jobs(args.agents, corpus_path, args.run_seeds, args.workers, args.timeout,
+                               args.memory_mb * 2 ** 20 if args.memory_mb else None,
+                               args.repetitions, args.warmup, args.memory):
+            failed += result["status"] != "ok"
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.corpus is None:
+            os.remove(corpus_path)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import contextlib
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from src.agent.registry import AGENTS, get_agent, solution_states, solution_cost
+from src.environment.env import Environment
+from src.environment.track import Track
+from src.environment import transition
+
+LENGTHS = [5, 10, 15, 20, 25, 30, 35, 40]
+SEEDS = [0, 1, 2]
+
+def build_corpus(lengths=LENGTHS, seeds=SEEDS):
+    return [Track.from_seed(length, seed) for length in lengths for seed in seeds]
+
+def percentile(values, q):
+    # linear interpolation between closest ranks, q in [0, 100]
+    values = sorted(values)
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+def solve_once(solve, track, goal, seed):
+    # fresh environment, cold transition cache and a fixed seed for the randomised agents
+    env = Environment(track.length, track=track)
+    transition.cache.clear()
+    random.seed(seed)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter_ns()
+        solution = solve(env, goal)
+        elapsed = time.perf_counter_ns() - start
+    return solution, elapsed, transition.cache.hits + transition.cache.misses
+
+def run_case(agent, track, goal=None, repetitions=5, warmup=1, memory=True, seed=0):
+    solve = get_agent(agent)
+    goal = goal if goal is not None else track.length - 1
+
+    for _ in range(warmup):
+        solve_once(solve, track, goal, seed)
+
+    times = []
+    for _ in range(repetitions):
+        solution, elapsed, transitions = solve_once(solve, track, goal, seed)
+        times.append(elapsed)
+
+    peak = None
+    if memory:
+        # separate run, tracemalloc slows the timed ones down
+        tracemalloc.start()
+        try:
+            solve_once(solve, track, goal, seed)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            # also on a timeout raised from inside the run (see pool.py), or every later
+            # run in this process would be traced too
+            tracemalloc.stop()
+
+    states = solution_states(solution)
+    cost = solution_cost(solution)
+    return {
+        "agent": agent,
+        "length": track.length,
+        "seed": track.seed,
+        "track": track.content_hash(),
+        "goal": goal,
+        "repetitions": repetitions,
+        "p50_ns": percentile(times, 50),
+        "p90_ns": percentile(times, 90),
+        "p99_ns": percentile(times, 99),
+        "min_ns": min(times),
+        "max_ns": max(times),
+        "transitions": transitions,
+        "peak_bytes": peak,
+        "solved": bool(states) and states[-1][0] >= goal,
+        "steps": len(states) - 1 if states else None,
+        "cost": round(cost, 6) if cost is not None else None,
+    }
+
+def run_suite(agents=None, tracks=None, repetitions=5, warmup=1, memory=True, progress=None):
+    agents = agents or sorted(AGENTS)
+    tracks = tracks if tracks is not None else build_corpus()
+    results = []
+    for agent in agents:
+        for track in tracks:
+            result = run_case(agent, track, repetitions=repetitions, warmup=warmup, memory=memory)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repetitions": repetitions,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, tolerance=0.2):
+    # regressions of current against baseline, matched by agent and track hash:
+    # p50 time more than `tolerance` slower, or a track the baseline solved left unsolved
+    previous = {(r["agent"], r["track"], r["goal"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["agent"], result["track"], result["goal"]))
+        if before is None:
+            continue
+        if result["p50_ns"] > before["p50_ns"] * (1 + tolerance):
+            regressions.append("%s length %d seed %s: p50 %.3f ms -> %.3f ms" % (
+                result["agent"], result["length"], result["seed"],
+                before["p50_ns"] / 1e6, result["p50_ns"] / 1e6))
+        if before["solved"] and not result["solved"]:
+            regressions.append("%s length %d seed %s: no longer solved" % (
+                result["agent"], result["length"], result["seed"]))
+    return regressions
@@ -1,17 +1,19 @@
-from src.environment.track import Track
-from src.environment.terrain import Terrain
-from src.environment.obs_reward import Obstacles, Rewards
+from src.environment.track import SEGMENTS, EFFECTS, OBSTACLE_CODES, REWARD_CODES
+from collections import namedtuple
+
+CarState = namedtuple('CarState', ['position', 'speed', 'battery', 'coins'])
 
 class Car:
     MAX_BATTERY = 100
     MAX_SPEED = 5
 
-    def __init__(self, track_length):
+    def __init__(self, track):
         self.position = 0
         self.speed = 1
         self.battery = 100
-        self.track = Track(track_length)
+        self.track = track
         self.coins = 0
+        self.observer = None
 
     def accelerate(self):
         self.speed = min(self.speed + 1, self.MAX_SPEED)
@@ -28,21 +30,47 @@ class Car:
     def collect_coin(self, amount):
         self.coins += amount
 
+    def snapshot(self):
+        return CarState(self.position, self.speed, self.battery, self.coins)
+
+    def restore(self, state):
+        self.position, self.speed, self.battery, self.coins = state
+
+    def apply_effect(self, effect):
+        speed_mult, speed_add, min_speed, battery_add, coins = effect
+        self.speed = min(max(min_speed, self.speed * speed_mult + speed_add), self.MAX_SPEED)
+        self.battery = min(self.battery + battery_add, self.MAX_BATTERY)
+        if coins:
+            self.collect_coin(coins)
+
     def move(self):
         self.battery -= (self.speed * 0.2)
         self.battery = round(max(0, self.battery), 2)
 
-        seg_info = self.track.get_segment(self.position)
-
-        if isinstance(seg_info, Terrain):
-            original = self.speed
-            self.speed = max(1, min(original * seg_info.get_mult(), self.MAX_SPEED))
-            
-        elif isinstance(seg_info, Obstacles):
-            seg_info.impact(self)
-            
-        elif isinstance(seg_info, Rewards):
-            seg_info.impact(self)
+        code = self.track.get_code(self.position)
+        if code is not None:
+            self.apply_effect(EFFECTS[code])
 
         self.speed = round(self.speed, 2)
-        self.position += max(1, int(self.speed))
\ No newline at end of file
+        if self.observer is not None and code is not None:
+            self.report_segment(code)
+        self.position += max(1, int(self.speed))
+
+    def report_segment(self, code):
+        segment = SEGMENTS[code]
+        if code in OBSTACLE_CODES:
+            self.observer.emit("collision", position=self.position, obstacle=segment.type,
+                               speed=self.speed, battery=self.battery)
+        elif code in REWARD_CODES:
+            self.observer.emit("reward", position=self.position, reward=segment.type,
+                               speed=self.speed, battery=self.battery, coins=self.coins)
+
+    def drive(self, action):
+        if action == 'accelerate':
+            self.accelerate()
+        elif action == 'decelerate':
+            self.decelerate()
+        elif action == 'recharge':
+            self.recharge()
+
+        self.move()
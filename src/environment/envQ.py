@@ -1,19 +1,31 @@
 from src.environment.car import Car
 from src.environment.track import Track
+from src.environment.fixed_point import pack_state
 from src.environment.obs_reward import Obstacles, Rewards
 
 class Environment:
-    def __init__(self, track_length):
-        self.track = Track(track_length)
-        self.car = Car(track_length)
-        self.rebuild()
+    def __init__(self, track_length, track=None):
+        self.track = track if track is not None else Track(track_length)
+        self.car = Car(self.track)
+        self.observer = None
+        self.reset()
+
+    def set_observer(self, observer):
+        # observer gets structured events (see events.py); None turns them off
+        self.observer = observer
+        self.car.observer = observer
     
-    def rebuild(self):
+    def reset(self):
+        # back to the start line on the same track
         self.car.position = 0
         self.car.battery = 100
         self.car.speed = 1
         self.car.coins = 0
-        self.track.init_track(self.track.length)
+
+    def rebuild(self, seed=None):
+        # new layout generated into the existing track buffer, then reset
+        self.track.regenerate(seed)
+        self.reset()
 
     def simple_reward(self):
         if self.car.position >= self.track.length:
@@ -83,25 +95,37 @@ class Environment:
         return reward + progress_reward - (speed_penalty + battery_penalty)
 
     def step(self, action):
-        if action == 'accelerate':
-            self.car.accelerate()
-        elif action == 'decelerate':
-            self.car.decelerate()
-        elif action == 'recharge':
-            self.car.recharge()
-        
-        self.car.move()
+        self.car.drive(action)
 
         # reward = self.simple_reward()
         reward = self.reward_function()
         done = self.game_over()
+
+        if self.observer is not None:
+            self.observer.emit("step", action=action, position=self.car.position, speed=self.car.speed,
+                               battery=self.car.battery, coins=self.car.coins, reward=reward, done=done)
+            if done:
+                self.report_terminal()
         
         return self.get_state(), reward, done
 
     def game_over(self):
-        print(f"\nPostiion: {self.car.position} \n Battery: {self.car.battery} \nSpeed: {self.car.speed} \n")
         return self.car.position >= self.track.length or self.car.battery <= 0  or self.car.speed == 0
     
-    def get_state(self):
-        return (self.car.position, self.car.speed, self.car.battery, self.car.coins)
+    def report_terminal(self):
+        if self.car.position >= self.track.length:
+            reason = "goal"
+        elif self.car.battery <= 0:
+            reason = "battery"
+        else:
+            reason = "stalled"
+        self.observer.emit("terminal", reason=reason, position=self.car.position,
+                           speed=self.car.speed, battery=self.car.battery, coins=self.car.coins)
+
+    def get_state(self, packed=False):
+        state = (self.car.position, self.car.speed, self.car.battery, self.car.coins)
+        if packed:
+            # one int key with speed and battery in hundredths, see fixed_point.py
+            return pack_state(state)
+        return state
 
@@ -0,0 +1,27 @@
+import json
+from collections import deque
+
+# observers receive emit(event, **fields); Environment and Car hold None when nothing listens,
+# so the disabled path is a single attribute check
+
+class RingBufferSink:
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, event, **fields):
+        fields["event"] = event
+        self.events.append(fields)
+
+    def clear(self):
+        self.events.clear()
+
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def emit(self, event, **fields):
+        fields["event"] = event
+        self.file.write(json.dumps(fields) + "\n")
+
+    def close(self):
+        self.file.close()
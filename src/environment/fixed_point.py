@@ -0,0 +1,44 @@
+# integer form of a (position, speed, battery, coins) state: speed and battery in
+# hundredths, the precision Car.move rounds them to. Float states that differ only by
+# rounding noise (e.g. 79.8 + 20 vs 99.8) map to the same integers.
+SCALE = 100
+
+# pack_state() layout of the key, low bits first: speed, battery, then the position in
+# all the bits above, so any position fits (the key stays below 2**64 up to 2**40).
+# Coins are left out: they never change the dynamics or the step costs, so states that
+# differ only in coins are the same search state (transition.py keys its cache the same way)
+SPEED_BITS = 10
+BATTERY_BITS = 14
+# an animal can take the battery a few units below zero before the next move clamps it
+BATTERY_OFFSET = 10 * SCALE
+
+BATTERY_SHIFT = SPEED_BITS
+POSITION_SHIFT = BATTERY_SHIFT + BATTERY_BITS
+
+def to_fixed(state):
+    position, speed, battery, coins = state
+    return (position, int(round(speed * SCALE)), int(round(battery * SCALE)), coins)
+
+def from_fixed(fixed):
+    position, speed, battery, coins = fixed
+    return (position, speed / SCALE, battery / SCALE, coins)
+
+def pack_fixed(fixed):
+    position, speed, battery, _ = fixed
+    battery += BATTERY_OFFSET
+    if speed >> SPEED_BITS or battery >> BATTERY_BITS or min(position, speed, battery) < 0:
+        raise ValueError("state %r does not fit a packed key" % (fixed,))
+    return speed | battery << BATTERY_SHIFT | position << POSITION_SHIFT
+
+def pack_state(state):
+    return pack_fixed(to_fixed(state))
+
+def unpack_fixed(key):
+    # coins aren't in the key and come back as 0
+    speed = key & ((1 << SPEED_BITS) - 1)
+    battery = ((key >> BATTERY_SHIFT) & ((1 << BATTERY_BITS) - 1)) - BATTERY_OFFSET
+    position = key >> POSITION_SHIFT
+    return (position, speed, battery, 0)
+
+def unpack_state(key):
+    return from_fixed(unpack_fixed(key))
@@ -0,0 +1,61 @@
+from src.environment.track import SEGMENTS, CHUNK_SIZE, fill_chunk, new_token
+from collections import OrderedDict
+from array import array
+import hashlib
+import random
+
+class LazyTrack:
+    # a seeded track whose segments are generated chunk by chunk on first use; only the
+    # `window` most recently used chunks stay in memory and an evicted chunk is rebuilt
+    # from (seed, chunk) when it is needed again. Same layout as Track.from_seed(length, seed).
+    def __init__(self, length, seed, window=8):
+        self.length = length
+        self.seed = seed
+        self.window = window
+        self.chunks = OrderedDict()
+        self.generated = 0
+        self.token = new_token()
+
+    def chunk(self, index):
+        codes = self.chunks.get(index)
+        if codes is None:
+            codes = self.build_chunk(index)
+            self.chunks[index] = codes
+            if len(self.chunks) > self.window:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(index)
+        return codes
+
+    def build_chunk(self, index):
+        size = min(CHUNK_SIZE, self.length - index * CHUNK_SIZE)
+        codes = array('B', bytes(size))
+        fill_chunk(codes, 0, self.seed, index, self.length)
+        self.generated += 1
+        return codes
+
+    def regenerate(self, seed=None):
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.chunks.clear()
+        self.token = new_token()
+        return True
+
+    def content_hash(self):
+        # streams every chunk through the hash without keeping them resident
+        digest = hashlib.blake2b(digest_size=16)
+        for index in range((self.length + CHUNK_SIZE - 1) // CHUNK_SIZE):
+            codes = self.chunks.get(index)
+            digest.update(codes if codes is not None else self.build_chunk(index))
+        return digest.hexdigest()
+
+    def get_code(self, current_position):
+        if current_position < self.length:
+            return self.chunk(current_position // CHUNK_SIZE)[current_position % CHUNK_SIZE]
+        else:
+            return None
+
+    def get_segment(self, current_position):
+        code = self.get_code(current_position)
+        if code is None:
+            return None
+        return SEGMENTS[code]
@@ -2,45 +2,46 @@ import random
 
 class Obstacles:
     obs = ["wall", "animal",'mud']
+    # (speed_mult, speed_add, min_speed, battery_add, coins)
+    effects = {
+        "wall": (1, -2, 0, 0, 0),
+        "animal": (1, -1, 1, -3, 0),
+        "mud": (0.7, 0, 1, 0, 0),
+    }
 
     def __init__(self, obstacle):
         self.type = obstacle
+        self.effect = self.effects[obstacle]
 
     @classmethod
-    def random_obstacle(cls):
+    def random_obstacle(cls, rng=random):
         # Randomly select an obstacle type
-        obstacle = random.choice(cls.obs)
+        obstacle = rng.choice(cls.obs)
         return cls(obstacle)
     
     def impact(self, car):
-        if self.type == "wall":
-            car.speed = max(0, car.speed - 2)
-        elif self.type == "animal":
-            car.decelerate()
-            car.battery -= 3
-        elif self.type == "mud":
-            car.speed = max(1, car.speed * 0.7)
+        car.apply_effect(self.effect)
 
 class Rewards:
     rews = ["small_coin",'big_coin', "benzene",'speed_boost','nitro_boost']
+    # (speed_mult, speed_add, min_speed, battery_add, coins)
+    effects = {
+        "small_coin": (1, 0, 0, 0, 1),
+        "big_coin": (1, 0, 0, 0, 10),
+        "benzene": (1, 0, 0, 10, 0),
+        "speed_boost": (1, 1, 0, 0, 0),
+        "nitro_boost": (1.5, 0, 0, 0, 0),
+    }
 
     def __init__(self, reward):
         self.type = reward
+        self.effect = self.effects[reward]
     
     @classmethod
-    def random_reward(cls):
+    def random_reward(cls, rng=random):
         # Randomly select a reward type
-        reward = random.choice(cls.rews)
+        reward = rng.choice(cls.rews)
         return cls(reward)
 
-    def impact(self,car):
-        if self.type == "small_coin":
-            car.collect_coin(1)
-        elif self.type == "big_coin":
-            car.collect_coin(10)
-        elif self.type == "benzene":
-            car.battery = min(car.battery + 10, car.MAX_BATTERY)
-        elif self.type == "speed_boost":
-           car.speed = min(car.speed + 1, car.MAX_SPEED)
-        elif self.type == "nitro_boost":
-            car.speed = min(car.speed * 1.5, car.MAX_SPEED)
\ No newline at end of file
+    def impact(self, car):
+        car.apply_effect(self.effect)
\ No newline at end of file
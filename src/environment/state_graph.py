@@ -0,0 +1,86 @@
+from src.environment.terrain import Terrain
+from src.environment.obs_reward import Obstacles
+from array import array
+
+ACTIONS = ["accelerate", "decelerate", "recharge", "move"]
+
+def step_cost(track, new_state):
+    # the edge cost A*, UCS and greedy charge for arriving in new_state; their
+    # get_successors and the compiled graph all go through here
+    segment = track.get_segment(new_state[0])
+    cost = 1
+    new_speed = new_state[1]
+
+    if isinstance(segment, Terrain):
+        cost += max(1, new_speed * segment.get_mult())
+    elif isinstance(segment, Obstacles):
+        cost += max(1, new_speed * 1.5)
+    return cost
+
+class StateGraph:
+    # reachable (position, speed, battery) states of one track, numbered 0..n-1 with node 0
+    # the start state; the edges of node n are offsets[n]:offsets[n + 1] of the edge arrays
+    def __init__(self, start):
+        self.start = start
+        self.states = []
+        self.index = {}
+        self.positions = array('l')
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.costs = array('d')
+        self.actions = array('B')
+        self.coins = array('l')
+        self.values = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def add_node(self, key):
+        node = self.index.get(key)
+        if node is None:
+            node = len(self.states)
+            self.index[key] = node
+            self.states.append(key)
+            self.positions.append(key[0])
+        return node
+
+    def node(self, state):
+        return self.index.get(tuple(state[:3]))
+
+    def state(self, node, coins=0):
+        return self.states[node] + (self.start[3] + coins,)
+
+    def edges(self, node):
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    def node_values(self, key, fn):
+        # per-node array of fn(state), computed once per key (e.g. a heuristic and its goal)
+        values = self.values.get(key)
+        if values is None:
+            values = array('d', [fn(state) for state in self.states])
+            self.values[key] = values
+        return values
+
+def compile_graph(environment, start=None):
+    # enumerate every state reachable from start once; nodes are numbered in breadth-first
+    # order, states at or past the end of the track are leaves
+    track = environment.track
+    start = tuple(start if start is not None else environment.get_state())
+    graph = StateGraph(start)
+    graph.add_node(start[:3])
+
+    node = 0
+    while node < len(graph.states):
+        position, speed, battery = graph.states[node]
+        if position < track.length:
+            for action_index, action in enumerate(ACTIONS):
+                new_state = environment.peek((position, speed, battery, 0), action)
+                if new_state[0] <= position:
+                    continue
+                graph.targets.append(graph.add_node(new_state[:3]))
+                graph.costs.append(step_cost(track, new_state))
+                graph.actions.append(action_index)
+                graph.coins.append(new_state[3])
+        graph.offsets.append(len(graph.targets))
+        node += 1
+    return graph
@@ -7,15 +7,17 @@ class Terrain:
     def __init__(self, terrain):
         self.terrain = terrain
         self.speed_mult = self.types[terrain]
+        # (speed_mult, speed_add, min_speed, battery_add, coins)
+        self.effect = (self.speed_mult, 0, 1, 0, 0)
 
     @classmethod
-    def random_terrain(cls):
+    def random_terrain(cls, rng=random):
         # return random terrain type
-        terrain = random.choice(list(cls.types.keys()))
+        terrain = rng.choice(list(cls.types.keys()))
         return cls(terrain)
 
     def get_mult(self):
         return self.speed_mult
 
-segments = [Terrain.random_terrain().get_mult() for i in range(5)]
-print(segments)
+    def impact(self, car):
+        car.apply_effect(self.effect)
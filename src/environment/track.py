@@ -1,35 +1,130 @@
 from src.environment.terrain import Terrain
 from src.environment.obs_reward import Obstacles
 from src.environment.obs_reward import Rewards
+from array import array
+import hashlib
+import itertools
 import random
 
+# one shared instance per segment code, indexed by the codes stored in Track.codes
+SEGMENTS = (
+    [Terrain(terrain) for terrain in Terrain.types]
+    + [Obstacles(obstacle) for obstacle in Obstacles.obs]
+    + [Rewards(reward) for reward in Rewards.rews]
+)
+EFFECTS = [segment.effect for segment in SEGMENTS]
+
+TERRAIN_CODES = [code for code, segment in enumerate(SEGMENTS) if isinstance(segment, Terrain)]
+OBSTACLE_CODES = [code for code, segment in enumerate(SEGMENTS) if isinstance(segment, Obstacles)]
+REWARD_CODES = [code for code, segment in enumerate(SEGMENTS) if isinstance(segment, Rewards)]
+SEGMENT_CODES = {'terrain': TERRAIN_CODES, 'obstacle': OBSTACLE_CODES, 'reward': REWARD_CODES}
+
+# every generated layout gets a fresh token, so caches can key on it
+_tokens = itertools.count()
+
+# seeded layouts are generated in chunks of this many segments, each from its own
+# generator, so any chunk can be rebuilt on its own (see lazy_track.py)
+CHUNK_SIZE = 4096
+
+def new_token():
+    return next(_tokens)
+
+def random_code(position, length, rng):
+    # pick a segment type, then a random code of that type
+    if position < length // 2: 
+        segment_type = rng.choice(['terrain', 'reward'])
+    else:
+        segment_type = rng.choice(['terrain', 'obstacle', 'reward'])
+    return rng.choice(SEGMENT_CODES[segment_type])
+
+def chunk_rng(seed, chunk):
+    return random.Random("%s:%d" % (seed, chunk))
+
+def fill_chunk(codes, offset, seed, chunk, length):
+    # write the codes of one seeded chunk into codes, starting at offset
+    start = chunk * CHUNK_SIZE
+    rng = chunk_rng(seed, chunk)
+    for i in range(start, min(start + CHUNK_SIZE, length)):
+        codes[offset + i - start] = random_code(i, length, rng)
+
 class Track:
-    def __init__(self, length):
+    def __init__(self, length, rng=random, codes=None, seed=None):
         self.length = length
-        self.segments = []
-        self.init_track(length)
+        self.seed = seed
+        self.allocations = 0
+        # called as listener(track, position, old_code, new_code) by set_segment
+        self.listeners = []
+        if codes is None:
+            self.codes = array('B')
+            self.init_track(length, rng, seed)
+        else:
+            # e.g. a read-only memoryview over a mapped track file (see track_store.py)
+            self.codes = codes
+            self.token = new_token()
+
+    @classmethod
+    def from_seed(cls, length, seed):
+        # the layout depends only on (length, seed), and matches LazyTrack(length, seed)
+        return cls(length, seed=seed)
+
+    @classmethod
+    def from_codes(cls, codes):
+        return cls(len(codes), codes=codes)
     
-    def init_track(self,length):
-        # loop till the end of the track
-        # call random functions in terrain, obstacle, reward to make the segment
-        for i in range(length):
-            if i < length // 2: 
-                segment_type = random.choice(['terrain', 'reward'])
-            else:
-                segment_type = random.choice(['terrain', 'obstacle', 'reward'])
-
-            if segment_type == 'terrain':
-                self.segments.append(Terrain.random_terrain())
-            elif segment_type == 'obstacle':
-                self.segments.append(Obstacles.random_obstacle())
-            elif segment_type == 'reward':
-                self.segments.append(Rewards.random_reward())
-        return self.segments
+    def init_track(self, length, rng=random, seed=None):
+        # regenerate the layout in place; the buffer is only replaced when the
+        # length changes or it is a read-only view (e.g. loaded from a track file)
+        if not isinstance(self.codes, array) or len(self.codes) != length:
+            self.codes = array('B', bytes(length))
+            self.allocations += 1
 
+        if seed is None:
+            # loop till the end of the track
+            for i in range(length):
+                self.codes[i] = random_code(i, length, rng)
+        else:
+            for chunk in range((length + CHUNK_SIZE - 1) // CHUNK_SIZE):
+                fill_chunk(self.codes, chunk * CHUNK_SIZE, seed, chunk, length)
+        self.length = length
+        self.token = new_token()
+        return self.codes
+
+    def regenerate(self, seed=None):
+        # new layout of the same length; returns True when no new buffer was allocated
+        allocations = self.allocations
+        self.seed = seed
+        self.init_track(self.length, seed=seed)
+        return self.allocations == allocations
+
+    def set_segment(self, position, code):
+        # change one segment in place, e.g. an obstacle appears or a reward is used up.
+        # The layout no longer matches its seed, and the new token retires cached transitions
+        old_code = self.codes[position]
+        self.codes[position] = code
+        self.seed = None
+        self.token = new_token()
+        for listener in list(self.listeners):
+            listener(self, position, old_code, code)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def content_hash(self):
+        # stable across runs and machines; identical layouts hash the same
+        return hashlib.blake2b(self.codes[:self.length], digest_size=16).hexdigest()
+
+    def get_code(self, current_position):
+        if current_position < len(self.codes):
+            return self.codes[current_position]
+        else:
+            return None
 
     def get_segment(self,current_position):
         # return segment info
-        if current_position < len(self.segments):
-            return self.segments[current_position]
-        else:
-            return None
\ No newline at end of file
+        code = self.get_code(current_position)
+        if code is None:
+            return None
+        return SEGMENTS[code]
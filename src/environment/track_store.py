@@ -0,0 +1,55 @@
+import mmap
+import struct
+from src.environment.track import Track
+
+# file layout, little endian:
+#   header  magic b"RTRK", version u16, reserved u16, track count u64
+#   index   one (offset u64, length u64, seed i64) entry per track, seed -1 when unknown
+#   body    the segment codes of every track, one byte per segment
+MAGIC = b"RTRK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+ENTRY = struct.Struct("<QQq")
+
+def save_tracks(path, tracks):
+    offset = HEADER.size + ENTRY.size * len(tracks)
+    entries = []
+    for track in tracks:
+        seed = track.seed if isinstance(track.seed, int) and 0 <= track.seed < 2 ** 63 else -1
+        entries.append(ENTRY.pack(offset, track.length, seed))
+        offset += track.length
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(tracks)))
+        f.writelines(entries)
+        for track in tracks:
+            f.write(track.codes[:track.length])
+
+def load_tracks(path):
+    # the file is mapped read-only and every track's codes is a view into it, so loading
+    # copies nothing and processes that map the same file share its pages
+    with open(path, "rb") as f:
+        data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    magic, version, _, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a version %d track file" % (path, VERSION))
+
+    tracks = []
+    for i in range(count):
+        offset, length, seed = ENTRY.unpack_from(data, HEADER.size + i * ENTRY.size)
+        track = Track.from_codes(data[offset:offset + length])
+        track.seed = seed if seed >= 0 else None
+        tracks.append(track)
+    return tracks
+
+def save_track(path, track):
+    save_tracks(path, [track])
+
+def load_track(path):
+    return load_tracks(path)[0]
+
+def generate_corpus(path, lengths, seeds):
+    tracks = [Track.from_seed(length, seed) for length in lengths for seed in seeds]
+    save_tracks(path, tracks)
+    return tracks
@@ -0,0 +1,51 @@
+from src.environment.car import Car
+from collections import OrderedDict
+
+class TransitionCache:
+    def __init__(self, maxsize=2 ** 18):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+# shared by every agent; the dynamics don't depend on coins, so coins stay out of the key
+cache = TransitionCache()
+
+def simulate(track, position, speed, battery, action):
+    car = Car(track)
+    car.restore((position, speed, battery, 0))
+    car.drive(action)
+    return (car.position, car.speed, car.battery, car.coins)
+
+def transition(track, state, action):
+    position, speed, battery, coins = state
+    key = (track.token, position, speed, battery, action)
+    result = cache.get(key)
+    if result is None:
+        result = simulate(track, position, speed, battery, action)
+        cache.put(key, result)
+
+    new_position, new_speed, new_battery, gained = result
+    return (new_position, new_speed, new_battery, coins + gained)
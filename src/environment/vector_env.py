@@ -0,0 +1,122 @@
+import numpy as np
+from src.environment.track import Track, SEGMENTS, EFFECTS
+from src.environment.car import Car
+from src.environment.terrain import Terrain
+
+ACTIONS = ["accelerate", "decelerate", "recharge", "move"]
+ACCELERATE, DECELERATE, RECHARGE, MOVE = range(len(ACTIONS))
+
+# code used for every position past the end of the track: no effect, no reward
+NO_SEGMENT = len(SEGMENTS)
+CODES = {(segment.terrain if isinstance(segment, Terrain) else segment.type): code
+         for code, segment in enumerate(SEGMENTS)}
+
+_effects = np.array(EFFECTS + [(1, 0, 0, 0, 0)], dtype=np.float64)
+SPEED_MULT, SPEED_ADD, MIN_SPEED, BATTERY_ADD, COINS = _effects.T
+COINS = COINS.astype(np.int64)
+
+def round2(x):
+    # same result as Python's round(x, 2); np.round(x, 2) scales by 100 first and
+    # gets values such as 2.205 (stored as 2.20500000000000007) wrong
+    scaled = x * 100
+    split = x * 134217729.0
+    high = split - (split - x)
+    low = x - high
+    error = (high * 100 - scaled) + low * 100  # x * 100 == scaled + error exactly
+
+    lower = np.floor(scaled)
+    above_half = (scaled - (lower + 0.5)) + error
+    upper = (above_half > 0) | ((above_half == 0) & (lower % 2 == 1))
+    return np.where(upper, lower + 1, lower) / 100
+
+def batch_reward(position, speed, battery, codes, length, max_speed=Car.MAX_SPEED):
+    # envQ.Environment.reward_function over arrays; codes is the segment code under each car
+    reward = np.zeros(len(position))
+    reward += np.where(codes == CODES["wall"], np.where(speed > 2, -10, -30), 0)
+    reward += np.where(codes == CODES["animal"], -15, 0)
+    reward += np.where(codes == CODES["mud"], -5, 0)
+    reward += np.where(codes == CODES["small_coin"], 5, 0)
+    reward += np.where(codes == CODES["big_coin"], 50, 0)
+    reward += np.where(codes == CODES["benzene"], np.where(battery < 50, 20, 10), 0)
+    reward += np.where(codes == CODES["speed_boost"], np.where(speed <= 2, 10, 5), 0)
+    reward += np.where(codes == CODES["nitro_boost"], np.where(speed <= 2, 20, 10), 0)
+
+    steps_to_goal = (length - position) / np.maximum(speed, 0.1)
+    battery_consumption = steps_to_goal * 0.2 * speed
+    reward -= np.where(battery_consumption > battery, (length - position) + 100, 0)
+
+    speed_penalty = (max_speed - speed) * 0.3
+    battery_penalty = (100 - battery) * 0.5
+    progress_reward = (position / length) * 10
+    reward = reward + progress_reward - (speed_penalty + battery_penalty)
+
+    reward = np.where((battery <= 0) | (speed == 0), -100, reward)
+    return np.where(position >= length, 100, reward)
+
+def batch_drive(speed, battery, actions, codes):
+    # Car.drive over arrays of any (broadcastable) shape: (speed, battery, advance) after
+    # taking each action on the segment with that code
+    speed = np.where(actions == ACCELERATE, np.minimum(speed + 1, Car.MAX_SPEED), speed)
+    speed = np.where(actions == DECELERATE, np.maximum(speed - 1, 1), speed)
+    recharge = (actions == RECHARGE) & (battery <= 70)
+    battery = np.where(recharge, np.minimum(battery + 20, Car.MAX_BATTERY), battery)
+
+    battery = round2(np.maximum(0, battery - speed * 0.2))
+
+    speed = np.minimum(np.maximum(MIN_SPEED[codes], speed * SPEED_MULT[codes] + SPEED_ADD[codes]), Car.MAX_SPEED)
+    battery = np.minimum(battery + BATTERY_ADD[codes], Car.MAX_BATTERY)
+
+    speed = round2(speed)
+    return speed, battery, np.maximum(1, speed.astype(np.int64))
+
+class VectorEnvironment:
+    # num_cars independent cars stepped together; actions are indices into ACTIONS
+    def __init__(self, track_length, num_cars, shared_track=True, tracks=None):
+        if tracks is None:
+            tracks = [Track(track_length)] if shared_track else [Track(track_length) for _ in range(num_cars)]
+        if len(tracks) not in (1, num_cars):
+            raise ValueError("expected one shared track or one track per car")
+        if any(track.length != track_length for track in tracks):
+            raise ValueError("all tracks must have length %d" % track_length)
+
+        self.track_length = track_length
+        self.num_cars = num_cars
+        self.tracks = tracks
+
+        # one row of codes per track, padded with NO_SEGMENT so finished cars index safely
+        self.codes = np.full((len(tracks), track_length + 1), NO_SEGMENT, dtype=np.uint8)
+        for row, track in enumerate(tracks):
+            self.codes[row, :track_length] = np.frombuffer(track.codes, dtype=np.uint8)[:track_length]
+        self.rows = np.zeros(num_cars, dtype=np.intp) if len(tracks) == 1 else np.arange(num_cars)
+
+        self.position = np.zeros(num_cars, dtype=np.int64)
+        self.speed = np.zeros(num_cars)
+        self.battery = np.zeros(num_cars)
+        self.coins = np.zeros(num_cars, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=slice(None)):
+        # every car by default, otherwise the cars selected by mask
+        self.position[mask] = 0
+        self.speed[mask] = 1
+        self.battery[mask] = 100
+        self.coins[mask] = 0
+
+    def segment_codes(self):
+        return self.codes[self.rows, np.minimum(self.position, self.track_length)]
+
+    def step(self, actions):
+        code = self.segment_codes()
+        self.speed, self.battery, advance = batch_drive(self.speed, self.battery, np.asarray(actions), code)
+        self.coins += COINS[code]
+        self.position += advance
+
+        rewards = batch_reward(self.position, self.speed, self.battery, self.segment_codes(), self.track_length)
+        dones = (self.position >= self.track_length) | (self.battery <= 0) | (self.speed == 0)
+
+        # finished cars start over straight away; dones tells the caller which ones did
+        self.reset(dones)
+        return self.get_states(), rewards, dones
+
+    def get_states(self):
+        return np.stack([self.position, self.speed, self.battery, self.coins], axis=1)